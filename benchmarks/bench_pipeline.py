@@ -0,0 +1,202 @@
+"""Time each stage of the dashboard pipeline at several dataset sizes.
+
+Datasets are generated once per scale with ``src/data_gen.py`` and reused.
+Every stage runs outside Streamlit and records wall time, rows processed and
+the process peak RSS after it finishes. Each scale runs in a fresh process so
+peak memory is not carried over between scales.
+
+    python benchmarks/bench_pipeline.py --scales 10000 1000000 --output results.json
+    python benchmarks/bench_pipeline.py --baseline baseline.json --threshold 1.2
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+import plotly.express as px  # noqa: E402
+
+import data_gen  # noqa: E402
+from alerts import CriticalAlerts  # noqa: E402
+from columnar import read_frame  # noqa: E402
+from cube import AnalyticsCube  # noqa: E402
+from ingest import Delta  # noqa: E402
+from keywords import build_matcher  # noqa: E402
+from polarity_cache import PolarityCache  # noqa: E402
+from sentiment import SCORER_VERSION, label_sentiment, score_polarity  # noqa: E402
+from settings import COMMENTS_CSV, ENGAGEMENT_MAX_POINTS, POSTS_CSV  # noqa: E402
+from timeseries import EngagementTimeline  # noqa: E402
+
+DEFAULT_SCALES = [10_000, 1_000_000, 10_000_000]
+DATA_DIR = os.path.join(ROOT, "benchmarks", ".data")
+
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+class Recorder:
+    def __init__(self):
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name):
+        info = {}
+        start = time.perf_counter()
+        yield info
+        info["seconds"] = round(time.perf_counter() - start, 4)
+        info["peak_rss_mb"] = round(peak_rss_mb(), 1)
+        self.stages[name] = info
+        print(f"  {name:<20} {info['seconds']:>9.3f}s  {info['peak_rss_mb']:>8.1f} MB")
+
+
+def dataset(scale, seed):
+    out_dir = os.path.join(DATA_DIR, f"{scale}-{seed}")
+    posts_path = os.path.join(out_dir, POSTS_CSV)
+    comments_path = os.path.join(out_dir, COMMENTS_CSV)
+    if not os.path.exists(comments_path):
+        os.makedirs(out_dir, exist_ok=True)
+        print(f"Generating {scale:,} comments in {out_dir}")
+        data_gen.write(data_gen.generate(comments=scale, seed=seed), out_dir)
+    return posts_path, comments_path
+
+
+def run_pipeline(posts_path, comments_path, use_cache=False):
+    rec = Recorder()
+
+    with rec.stage("csv_load") as info:
+        posts = read_frame(posts_path, data_format="csv")
+        comments = read_frame(comments_path, data_format="csv")
+        info["rows"] = len(posts) + len(comments)
+
+    with rec.stage("sentiment_scoring") as info:
+        if use_cache:
+            with PolarityCache(SCORER_VERSION) as cache:
+                comments["sentiment"] = score_polarity(comments["comment_text"], cache)
+        else:
+            comments["sentiment"] = score_polarity(comments["comment_text"])
+        info["rows"] = len(comments)
+
+    with rec.stage("labelling") as info:
+        comments["sentiment_label"] = label_sentiment(comments["sentiment"])
+        info["rows"] = len(comments)
+
+    with rec.stage("keyword_matching") as info:
+        comments = comments.join(build_matcher().classify(comments["comment_text"]))
+        info["rows"] = len(comments)
+
+    frames = SimpleNamespace(posts=posts, comments=comments)
+    with rec.stage("groupbys") as info:
+        cube = AnalyticsCube()
+        cube.apply(Delta(posts, comments, True), frames)
+        timeline = EngagementTimeline()
+        timeline.apply(Delta(posts, comments, True), frames)
+        info["rows"] = len(cube.posts) + len(cube.comments)
+
+    with rec.stage("critical_alerts") as info:
+        alerts = CriticalAlerts()
+        alerts.apply(Delta(posts, comments, True), frames)
+        info["rows"] = len(alerts.alerts())
+
+    with rec.stage("chart_payloads") as info:
+        first, last = timeline.date_range
+        figures = [
+            px.pie(
+                cube.sentiment_counts().reset_index(),
+                names="sentiment_label",
+                values="comment_count",
+            ),
+            px.bar(cube.sentiment_by_platform(), barmode="group"),
+            px.line(
+                timeline.series("day", first, last, ENGAGEMENT_MAX_POINTS),
+                x="date",
+                y="value",
+                color="metric",
+            ),
+            px.treemap(
+                names=list(cube.topic_counts()),
+                parents=[""] * len(cube.topic_counts()),
+                values=list(cube.topic_counts().values()),
+            ),
+        ]
+        info["bytes"] = sum(len(fig.to_json()) for fig in figures)
+
+    return rec.stages
+
+
+def compare(results, baseline, threshold):
+    """Print per-stage time ratios against ``baseline``; return the regressions."""
+    regressions = []
+    for scale, stages in results["results"].items():
+        for name, info in stages.items():
+            before = baseline.get("results", {}).get(scale, {}).get(name)
+            if not before or not before["seconds"]:
+                continue
+            ratio = info["seconds"] / before["seconds"]
+            flag = "REGRESSION" if ratio > threshold else ""
+            print(f"  {scale:>10} {name:<20} x{ratio:>6.2f} {flag}")
+            if flag:
+                regressions.append((scale, name, ratio))
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", help="results JSON to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.2,
+        help="slowdown ratio counted as a regression",
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="score through the persistent polarity cache",
+    )
+    args = parser.parse_args()
+
+    results = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "cache": args.cache,
+        },
+        "results": {},
+    }
+    for scale in args.scales:
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            posts_path, comments_path = pool.submit(dataset, scale, args.seed).result()
+        print(f"Scale {scale:,} comments")
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            results["results"][str(scale)] = pool.submit(
+                run_pipeline, posts_path, comments_path, args.cache
+            ).result()
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Wrote {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print(f"Compared with {args.baseline} (threshold x{args.threshold})")
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
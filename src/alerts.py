@@ -0,0 +1,115 @@
+import heapq
+import itertools
+
+import pandas as pd
+
+from keywords import URGENT_COLUMN
+from settings import ALERT_TOP_K, ALERT_WINDOWS
+
+# =====================================
+# Streaming Critical Alerts
+# =====================================
+ALL_TIME = "All time"
+ALERT_COLUMNS = ["comment_id", "platform", "comment_text", "likes", "date"]
+WINDOWS = {name: pd.Timedelta(offset) for name, offset in ALERT_WINDOWS.items()}
+_RANK = ["likes", "earlier"]
+
+
+class CriticalAlerts:
+    """Most-liked urgent negative comments, overall and per recency window.
+
+    Registered on ``IncrementalLoader``; each delta is folded into bounded
+    min-heaps of ``k`` entries, so the matching comments are never sorted in
+    full: each delta contributes only its ``nlargest`` per heap. Windows are
+    served from hourly buckets that each keep their own top k, letting a
+    window slide forward without losing candidates; buckets older than the
+    longest window are dropped. Windows are measured back
+    from the newest comment, so replayed data behaves like a live feed.
+    """
+
+    def __init__(self, k=ALERT_TOP_K, windows=WINDOWS):
+        self.k = k
+        self.windows = windows
+        self._retention = max(windows.values(), default=pd.Timedelta(0))
+        self._clear()
+
+    def _clear(self):
+        self._top = []
+        self._total = 0
+        # hour -> [matching comment count, top-k heap]
+        self._buckets = {}
+        self._newest = None
+        self._alerts = dict.fromkeys([ALL_TIME, *self.windows], self._frame([]))
+        self._counts = dict.fromkeys([ALL_TIME, *self.windows], 0)
+
+    def apply(self, delta, loader):
+        if delta.reset:
+            self._clear()
+            comments = loader.comments
+        else:
+            comments = delta.comments
+        if comments.empty:
+            return
+
+        newest = comments["date"].max().floor("h")
+        self._newest = newest if self._newest is None else max(self._newest, newest)
+        cutoff = self._newest - self._retention
+
+        critical = comments.loc[
+            (comments["sentiment_label"] == "Negative") & comments[URGENT_COLUMN],
+            ALERT_COLUMNS,
+        ]
+        # Ties on likes keep the earlier comment.
+        critical = critical.assign(
+            hour=critical["date"].dt.floor("h"), earlier=-critical["comment_id"]
+        )
+        self._total += len(critical)
+        self._push(self._top, critical.nlargest(self.k, _RANK))
+        recent = critical[critical["hour"] > cutoff]
+        for hour, rows in recent.groupby("hour", sort=False):
+            bucket = self._buckets.setdefault(hour, [0, []])
+            bucket[0] += len(rows)
+            self._push(bucket[1], rows.nlargest(self.k, _RANK))
+        for hour in [hour for hour in self._buckets if hour <= cutoff]:
+            del self._buckets[hour]
+        self._publish()
+
+    def _push(self, heap, rows):
+        for record in rows[ALERT_COLUMNS].itertuples(index=False, name=None):
+            # Ties on likes keep the earlier comment.
+            entry = (record[3], -record[0], record)
+            if len(heap) < self.k:
+                heapq.heappush(heap, entry)
+            elif entry > heap[0]:
+                heapq.heapreplace(heap, entry)
+
+    def _frame(self, entries):
+        records = [record for *_, record in sorted(entries, reverse=True)]
+        return pd.DataFrame(records, columns=ALERT_COLUMNS)
+
+    def _publish(self):
+        # Built once per delta; reruns read the finished frames.
+        alerts = {ALL_TIME: self._frame(self._top)}
+        counts = {ALL_TIME: self._total}
+        for name, span in self.windows.items():
+            buckets = [
+                bucket
+                for hour, bucket in self._buckets.items()
+                if hour > self._newest - span
+            ]
+            counts[name] = sum(count for count, _ in buckets)
+            alerts[name] = self._frame(
+                heapq.nlargest(
+                    self.k, itertools.chain.from_iterable(heap for _, heap in buckets)
+                )
+            )
+        self._alerts, self._counts = alerts, counts
+
+    # ------------------
+    # Queries
+    # ------------------
+    def alerts(self, window=ALL_TIME):
+        return self._alerts[window]
+
+    def alert_counts(self):
+        return self._counts
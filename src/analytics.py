@@ -0,0 +1,133 @@
+import argparse
+import functools
+import json
+import threading
+
+from alerts import ALL_TIME, CriticalAlerts
+from clusters import ComplaintClusters
+from cube import AnalyticsCube
+from ingest import IncrementalLoader
+from post_index import PostIndex
+from settings import DATA_FORMAT, STORAGE_BACKEND
+from sql_backend import SqlStore
+from timeseries import EngagementTimeline
+
+# =====================================
+# Headless Analytics
+# =====================================
+# Everything the dashboard derives from the data, as functions of a loader
+# ``Snapshot``. Results are memoized on the snapshot's data_version, so a
+# Streamlit rerun that only changes a widget recomputes nothing.
+_MEMO_SIZE = 256
+_memo = {}
+_memo_lock = threading.Lock()
+
+
+def build_loader(data_format=DATA_FORMAT, backend=STORAGE_BACKEND):
+    """In-memory loader with its aggregates, or the shared SQL store."""
+    if backend == "sqlite":
+        return SqlStore(data_format)
+    loader = IncrementalLoader(data_format)
+    loader.add_aggregate(AnalyticsCube())
+    loader.add_aggregate(PostIndex())
+    loader.add_aggregate(EngagementTimeline())
+    loader.add_aggregate(CriticalAlerts())
+    loader.add_aggregate(ComplaintClusters())
+    return loader
+
+
+def memoized(fn):
+    @functools.wraps(fn)
+    def wrapper(snapshot, *args):
+        key = (fn.__name__, snapshot.data_version, args)
+        with _memo_lock:
+            if key in _memo:
+                return _memo[key]
+        result = fn(snapshot, *args)
+        with _memo_lock:
+            if len(_memo) >= _MEMO_SIZE:
+                # Drop results computed for older data versions first.
+                stale = [k for k in _memo if k[1] != snapshot.data_version]
+                for k in stale or list(_memo):
+                    del _memo[k]
+            _memo[key] = result
+        return result
+
+    return wrapper
+
+
+@memoized
+def executive_summary(snapshot):
+    return snapshot.aggregate(AnalyticsCube).summary()
+
+
+@memoized
+def sentiment_distribution(snapshot):
+    return snapshot.aggregate(AnalyticsCube).sentiment_counts().reset_index()
+
+
+@memoized
+def sentiment_by_platform(snapshot):
+    return snapshot.aggregate(AnalyticsCube).sentiment_by_platform()
+
+
+@memoized
+def topic_volume(snapshot):
+    return snapshot.aggregate(AnalyticsCube).topic_counts()
+
+
+@memoized
+def topic_complaints(snapshot):
+    return snapshot.aggregate(AnalyticsCube).topic_counts(sentiment_label="Negative")
+
+
+@memoized
+def critical_alerts(snapshot, window=ALL_TIME):
+    return snapshot.aggregate(CriticalAlerts).alerts(window)
+
+
+@memoized
+def alert_counts(snapshot):
+    return snapshot.aggregate(CriticalAlerts).alert_counts()
+
+
+@memoized
+def complaint_clusters(snapshot):
+    return snapshot.aggregate(ComplaintClusters).complaint_clusters()
+
+
+def engagement_date_range(snapshot):
+    return snapshot.aggregate(EngagementTimeline).date_range
+
+
+def engagement_series(snapshot, granularity, start, end, max_points):
+    # The timeline keeps its own per-window cache, cleared on new data.
+    return snapshot.aggregate(EngagementTimeline).series(
+        granularity, start, end, max_points
+    )
+
+
+def search_posts(snapshot, query=""):
+    return snapshot.aggregate(PostIndex).search(query)
+
+
+def post_detail(snapshot, post_id):
+    index = snapshot.aggregate(PostIndex)
+    return index.post(post_id), index.comments_for(post_id)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Print the executive summary as JSON without starting Streamlit."
+    )
+    parser.add_argument(
+        "--format", choices=["auto", "csv", "parquet", "arrow"], default=DATA_FORMAT
+    )
+    parser.add_argument(
+        "--backend", choices=["memory", "sqlite"], default=STORAGE_BACKEND
+    )
+    args = parser.parse_args()
+
+    loader = build_loader(args.format, args.backend)
+    loader.refresh()
+    print(json.dumps(executive_summary(loader.snapshot()), indent=2))
@@ -1,7 +1,17 @@
-import pandas as pd
 import streamlit as st
 import plotly.express as px
-from textblob import TextBlob
+
+import analytics
+from alerts import ALL_TIME
+from instrumentation import Profiler
+from post_index import PostIndex
+from settings import (
+    DEBUG_METRICS,
+    ENGAGEMENT_MAX_POINTS,
+    METRICS_FILE,
+    POST_PAGE_SIZE,
+)
+from timeseries import EngagementTimeline
 
 # =====================================
 # Page Config & Custom CSS
@@ -67,35 +77,34 @@ with col2:
 # =====================================
 # Data Loading
 # =====================================
-@st.cache_data
-def load_data():
-    posts = pd.read_csv("mock_posts_biz.csv")
-    comments = pd.read_csv("mock_comments_biz.csv")
+@st.cache_resource
+def get_loader():
+    # Shared across sessions; holds the frames, the post/comment watermarks
+    # and the aggregates that are folded forward with every delta (or, with
+    # STORAGE_BACKEND=sqlite, a handle on the shared database file)
+    return analytics.build_loader()
 
-    # Sentiment analysis
-    comments["sentiment"] = comments["comment_text"].apply(
-        lambda x: TextBlob(x).sentiment.polarity
-    )
-    comments["sentiment_label"] = comments["sentiment"].apply(
-        lambda x: "Positive" if x > 0.2 else "Negative" if x < -0.2 else "Neutral"
-    )
 
-    return posts, comments
+def load_data():
+    # Reads and scores only rows appended since the previous rerun
+    loader = get_loader()
+    loader.refresh()
+    return loader
 
 
-posts_df, comments_df = load_data()
+# Stage timings for this rerun; a shared no-op unless DEBUG_METRICS is set
+profiler = Profiler(DEBUG_METRICS, METRICS_FILE)
 
-# Calculate urgent issues
-urgent_issues = len(
-    comments_df[
-        (comments_df["sentiment_label"] == "Negative")
-        & (
-            comments_df["comment_text"].str.contains(
-                "urgent|critical|outage", case=False
-            )
-        )
-    ]
-)
+with profiler.stage("load_data") as stage:
+    loader = load_data()
+    stage.rows = loader.rows_ingested
+    stage.hits = loader.cache_stats["hits"]
+    stage.misses = loader.cache_stats["misses"]
+# All derived results come from the analytics module, memoized per data version
+data = loader.snapshot()
+
+with profiler.stage("summary"):
+    summary = analytics.executive_summary(data)
 
 # =====================================
 # Executive Summary Metrics
@@ -109,7 +118,7 @@ with cols[0]:
         f"""
     <div class="metric-card">
         <p style="font-size:14px; color:#666;">Total Posts</p>
-        <h3 style="{'; '.join(f'{k}:{v}' for k,v in metric_styles.items())}; color:#2E86AB;">{len(posts_df)}</h3>
+        <h3 style="{'; '.join(f'{k}:{v}' for k,v in metric_styles.items())}; color:#2E86AB;">{summary['total_posts']}</h3>
     </div>
     """,
         unsafe_allow_html=True,
@@ -120,23 +129,18 @@ with cols[1]:
         f"""
     <div class="metric-card">
         <p style="font-size:14px; color:#666;">High-Urgency Issues</p>
-        <h3 style="{'; '.join(f'{k}:{v}' for k,v in metric_styles.items())}; color:#C62828;">{urgent_issues}</h3>
+        <h3 style="{'; '.join(f'{k}:{v}' for k,v in metric_styles.items())}; color:#C62828;">{summary['urgent_issues']}</h3>
     </div>
     """,
         unsafe_allow_html=True,
     )
 
 with cols[2]:
-    pos = comments_df[comments_df["sentiment_label"] == "Positive"].shape[0]
-    if len(comments_df) > 0:
-        positive_percentage = int(pos / len(comments_df) * 100)
-    else:
-        positive_percentage = 0  # Default to 0% if no comments are available
     st.markdown(
         f"""
     <div class="metric-card">
         <p style="font-size:14px; color:#666;">Positive Sentiment</p>
-        <h3 style="{'; '.join(f'{k}:{v}' for k,v in metric_styles.items())}; color:#2E7D32;">{positive_percentage}%</h3>
+        <h3 style="{'; '.join(f'{k}:{v}' for k,v in metric_styles.items())}; color:#2E7D32;">{summary['positive_percentage']}%</h3>
     </div>
     """,
         unsafe_allow_html=True,
@@ -147,7 +151,7 @@ with cols[3]:
         f"""
     <div class="metric-card">
         <p style="font-size:14px; color:#666;">Avg. Engagement</p>
-        <h3 style="{'; '.join(f'{k}:{v}' for k,v in metric_styles.items())}; color:#2E86AB;">{round(posts_df[['likes','shares','comments']].mean().mean())}</h3>
+        <h3 style="{'; '.join(f'{k}:{v}' for k,v in metric_styles.items())}; color:#2E86AB;">{summary['avg_engagement']}</h3>
     </div>
     """,
         unsafe_allow_html=True,
@@ -163,12 +167,13 @@ tab1, tab2, tab3, tab4 = st.tabs(
 # ------------------
 # Sentiment Analysis
 # ------------------
-with tab1:
+with tab1, profiler.stage("sentiment_tab"):
     col1, col2 = st.columns(2)
     with col1:
         fig = px.pie(
-            comments_df,
+            analytics.sentiment_distribution(data),
             names="sentiment_label",
+            values="comment_count",
             title="<b>Overall Sentiment Distribution</b>",
             color="sentiment_label",
             color_discrete_map={
@@ -183,7 +188,7 @@ with tab1:
 
     with col2:
         fig = px.bar(
-            comments_df.groupby(["platform", "sentiment_label"]).size().unstack(),
+            analytics.sentiment_by_platform(data),
             title="<b>Sentiment by Platform</b>",
             barmode="group",
             color_discrete_map={
@@ -200,84 +205,119 @@ with tab1:
 # ------------------
 # Engagement Trends
 # ------------------
-with tab2:
-    posts_df["date"] = pd.to_datetime(posts_df["date"])
-    fig = px.line(
-        posts_df.sort_values("date"),
-        x="date",
-        y=["likes", "shares", "comments"],
-        title="<b>Engagement Over Time</b>",
-        markers=True,
-        color_discrete_sequence=["#2E86AB", "#F18F01", "#C62828"],
-    )
-    fig.update_layout(xaxis_title="Date", yaxis_title="Count", hovermode="x unified")
-    st.plotly_chart(fig, use_container_width=True)
+with tab2, profiler.stage("engagement_tab") as stage:
+    date_range = analytics.engagement_date_range(data)
+    if date_range is None:
+        st.info("No posts to chart yet")
+    else:
+        granularities = {"Daily": "day", "Weekly": "week", "Per post": "post"}
+        first_date, last_date = (d.date() for d in date_range)
+        control1, control2 = st.columns([1, 3])
+        with control1:
+            granularity = st.radio("Granularity", list(granularities), horizontal=True)
+        with control2:
+            window = (first_date, last_date)
+            if first_date < last_date:
+                window = st.slider(
+                    "Date range",
+                    min_value=first_date,
+                    max_value=last_date,
+                    value=window,
+                )
+
+        # Resampled and downsampled server-side; cached per window
+        timeline = data.aggregate(EngagementTimeline)
+        cached = timeline.hits
+        series = analytics.engagement_series(
+            data, granularities[granularity], *window, ENGAGEMENT_MAX_POINTS
+        )
+        stage.rows = len(series)
+        stage.hits = timeline.hits - cached
+        stage.misses = 1 - (timeline.hits - cached)
+        fig = px.line(
+            series,
+            x="date",
+            y="value",
+            color="metric",
+            title="<b>Engagement Over Time</b>",
+            markers=True,
+            color_discrete_sequence=["#2E86AB", "#F18F01", "#C62828"],
+        )
+        fig.update_layout(
+            xaxis_title="Date", yaxis_title="Count", hovermode="x unified"
+        )
+        st.plotly_chart(fig, use_container_width=True)
 
 # ------------------
 # Post Details
 # ------------------
-with tab3:
-    selected_post = st.selectbox("Select a Post", posts_df["post_text"], index=0)
-    post_data = posts_df[posts_df["post_text"] == selected_post].iloc[0]
-    post_comments = comments_df[comments_df["post_id"] == post_data["post_id"]]
+with tab3, profiler.stage("post_details_tab"):
+    search_col, page_col = st.columns([3, 1])
+    with search_col:
+        query = st.text_input("Search posts", placeholder="Filter by post text")
+    matches = analytics.search_posts(data, query)
+    page_count = max(1, -(-len(matches) // POST_PAGE_SIZE))
+    with page_col:
+        page = st.number_input(
+            f"Page (of {page_count})", min_value=1, max_value=page_count, value=1
+        )
+    page_ids = matches[(page - 1) * POST_PAGE_SIZE : page * POST_PAGE_SIZE]
 
-    col1, col2 = st.columns(2)
-    with col1:
-        st.markdown(
-            f"""
-        <div class="metric-card">
-            <h4>Post Details</h4>
-            <p><strong>Platform:</strong> {post_data['platform']}</p>
-            <p><strong>Type:</strong> {post_data['post_type']}</p>
-            <p><strong>Date:</strong> {post_data['date']}</p>
-            <div style="display: flex; gap: 15px; margin-top: 10px;">
-                <span>👍 {post_data['likes']}</span>
-                <span>🔗 {post_data['shares']}</span>
-                <span>💬 {post_data['comments']}</span>
-            </div>
-        </div>
-        """,
-            unsafe_allow_html=True,
+    if len(page_ids) == 0:
+        st.info("No posts match this search")
+    else:
+        selected_post_id = st.selectbox(
+            "Select a Post",
+            page_ids,
+            index=0,
+            format_func=data.aggregate(PostIndex).label,
         )
+        post_data, post_comments = analytics.post_detail(data, selected_post_id)
 
-    with col2:
-        if not post_comments.empty:
-            fig = px.pie(
-                post_comments,
-                names="sentiment_label",
-                title="<b>Sentiment for Post</b>",
-                hole=0.4,
-                color="sentiment_label",
-                color_discrete_map={
-                    "Positive": "#2E7D32",
-                    "Negative": "#C62828",
-                    "Neutral": "#2E86AB",
-                },
+        col1, col2 = st.columns(2)
+        with col1:
+            st.markdown(
+                f"""
+            <div class="metric-card">
+                <h4>Post Details</h4>
+                <p><strong>Platform:</strong> {post_data['platform']}</p>
+                <p><strong>Type:</strong> {post_data['post_type']}</p>
+                <p><strong>Date:</strong> {post_data['date']:%Y-%m-%d}</p>
+                <div style="display: flex; gap: 15px; margin-top: 10px;">
+                    <span>👍 {post_data['likes']}</span>
+                    <span>🔗 {post_data['shares']}</span>
+                    <span>💬 {post_data['comments']}</span>
+                </div>
+            </div>
+            """,
+                unsafe_allow_html=True,
             )
-            st.plotly_chart(fig, use_container_width=True)
-        else:
-            st.warning("No comments found for this post")
+
+        with col2:
+            if not post_comments.empty:
+                fig = px.pie(
+                    post_comments,
+                    names="sentiment_label",
+                    title="<b>Sentiment for Post</b>",
+                    hole=0.4,
+                    color="sentiment_label",
+                    color_discrete_map={
+                        "Positive": "#2E7D32",
+                        "Negative": "#C62828",
+                        "Neutral": "#2E86AB",
+                    },
+                )
+                st.plotly_chart(fig, use_container_width=True)
+            else:
+                st.warning("No comments found for this post")
 
 # ------------------
 # Tech Insights
 # ------------------
-with tab4:
+with tab4, profiler.stage("tech_insights_tab"):
     st.subheader("🔍 Technical Deep Dive")
 
-    tech_terms = {
-        "AI": comments_df["comment_text"]
-        .str.contains("AI|artificial intelligence", case=False)
-        .sum(),
-        "Cloud": comments_df["comment_text"]
-        .str.contains("cloud|AWS|Azure", case=False)
-        .sum(),
-        "Security": comments_df["comment_text"]
-        .str.contains("security|cyber|CVE", case=False)
-        .sum(),
-        "API": comments_df["comment_text"]
-        .str.contains("API|integration", case=False)
-        .sum(),
-    }
+    tech_terms = analytics.topic_volume(data)
 
     col1, col2 = st.columns(2)
     with col1:
@@ -292,7 +332,7 @@ with tab4:
         st.plotly_chart(fig, use_container_width=True)
 
     with col2:
-        negative_comments = comments_df[comments_df["sentiment_label"] == "Negative"]
+        complaints = analytics.topic_complaints(data)
         st.markdown(
             """
         <div style="background-color:#F6F7F8; padding:20px; border-radius:10px;">
@@ -301,8 +341,8 @@ with tab4:
         """
             + "\n".join(
                 [
-                    f"<li><span class='tech-term'>{term}</span>: {negative_comments['comment_text'].str.contains(term, case=False).sum()} complaints</li>"
-                    for term in tech_terms.keys()
+                    f"<li><span class='tech-term'>{term}</span>: {count} complaints</li>"
+                    for term, count in complaints.items()
                 ]
             )
             + """
@@ -312,15 +352,34 @@ with tab4:
             unsafe_allow_html=True,
         )
 
+    st.markdown("#### Recurring Complaints")
+    clusters = analytics.complaint_clusters(data)
+    if clusters.empty:
+        st.info("No negative comments to group yet")
+    else:
+        # Negative comments grouped by near-duplicate wording
+        st.dataframe(
+            clusters,
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                "complaint": "Complaint",
+                "comments": "Comments",
+                "likes": "Total likes",
+                "first_seen": st.column_config.DateColumn("First seen"),
+                "last_seen": st.column_config.DateColumn("Last seen"),
+                "variants": "Wordings",
+            },
+        )
+
 # ------------------
 # Critical Alerts
 # ------------------
-critical = comments_df[
-    (comments_df["sentiment_label"] == "Negative")
-    & (comments_df["comment_text"].str.contains("urgent|critical|outage", case=False))
-].sort_values("likes", ascending=False)
+with profiler.stage("critical_alerts"):
+    # Kept as bounded top-k heaps during ingestion; nothing is sorted here
+    alert_counts = analytics.alert_counts(data)
 
-if not critical.empty:
+if alert_counts[ALL_TIME]:
     st.markdown(
         """
     <div class="critical-alert">
@@ -329,16 +388,41 @@ if not critical.empty:
     """,
         unsafe_allow_html=True,
     )
+    alert_window = st.radio(
+        "Alert window",
+        list(alert_counts),
+        horizontal=True,
+        format_func=lambda window: f"{window} ({alert_counts[window]})",
+    )
+    with profiler.stage("critical_alerts_window") as stage:
+        critical = analytics.critical_alerts(data, alert_window)
+        stage.rows = len(critical)
 
-    for _, row in critical.head(3).iterrows():
+    for row in critical.itertuples(index=False):
         st.markdown(
             f"""
         <div style="padding:12px; margin:8px 0; background-color:#FFF5F5; border-radius:5px; border-left: 3px solid #C62828;">
-            <p style="margin:0; font-weight:bold;">{row['comment_text']}</p>
+            <p style="margin:0; font-weight:bold;">{row.comment_text}</p>
             <p style="margin:4px 0 0 0; font-size:0.8em; color:#666;">
-                <strong>{row['platform']}</strong> • {row['date']} • 👍 {row['likes']} likes
+                <strong>{row.platform}</strong> • {row.date:%Y-%m-%d} • 👍 {row.likes} likes
             </p>
         </div>
         """,
             unsafe_allow_html=True,
         )
+
+# ------------------
+# Debug Metrics
+# ------------------
+if profiler.enabled:
+    with st.expander("⚙️ Debug: stage timings"):
+        st.dataframe(profiler.records(), use_container_width=True)
+    footprint = loader.footprint_report()
+    if footprint is not None:
+        with st.expander("⚙️ Debug: memory footprint"):
+            st.caption(
+                f"{footprint['bytes_before'].sum() / 2**20:,.1f} MiB as loaded → "
+                f"{footprint['bytes_after'].sum() / 2**20:,.1f} MiB held"
+            )
+            st.dataframe(footprint, use_container_width=True)
+profiler.finish()
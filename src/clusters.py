@@ -0,0 +1,215 @@
+import numpy as np
+import pandas as pd
+
+from settings import (
+    CLUSTER_BANDS,
+    CLUSTER_NUM_PERM,
+    CLUSTER_THRESHOLD,
+    CLUSTER_TOP_N,
+)
+
+# =====================================
+# Near-duplicate Complaint Clustering
+# =====================================
+# Byte shingles of this length pack exactly into a uint64, so shingles
+# never collide before hashing.
+SHINGLE = 5
+CLUSTER_COLUMNS = [
+    "complaint",
+    "comments",
+    "likes",
+    "first_seen",
+    "last_seen",
+    "variants",
+]
+_SEED = 20240415
+
+
+def shingles(texts):
+    """Return ``(values, counts)``: every text's byte 5-grams as uint64, concatenated.
+
+    ``counts[i]`` is the number of shingles of ``texts[i]``; texts shorter than
+    a shingle are padded so each text has at least one.
+    """
+    encoded = [text.lower().encode("utf-8").ljust(SHINGLE) for text in texts]
+    lengths = np.fromiter(map(len, encoded), dtype="int64", count=len(encoded))
+    data = np.frombuffer(b"".join(encoded), dtype=np.uint8).astype(np.uint64)
+
+    # Value of the shingle starting at every byte position, texts run together
+    width = len(data) - SHINGLE + 1
+    packed = np.zeros(width, dtype=np.uint64)
+    for j in range(SHINGLE):
+        packed |= data[j : j + width] << np.uint64(8 * j)
+
+    # Keep only the positions whose shingle stays inside one text.
+    counts = lengths - SHINGLE + 1
+    starts = np.cumsum(lengths) - lengths
+    first = np.cumsum(counts) - counts
+    positions = np.arange(counts.sum()) + np.repeat(starts - first, counts)
+    return packed[positions], counts
+
+
+class MinHasher:
+    """MinHash signatures from multiply-shift hashes of the shingles."""
+
+    def __init__(self, num_perm=CLUSTER_NUM_PERM, bands=CLUSTER_BANDS):
+        rng = np.random.default_rng(_SEED)
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._a = rng.integers(1, 2**63, num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2**63, num_perm, dtype=np.uint64)
+        self._band_mix = rng.integers(1, 2**63, self.rows, dtype=np.uint64)
+
+    def signatures(self, texts):
+        values, counts = shingles(texts)
+        offsets = np.cumsum(counts) - counts
+        signatures = np.empty((len(texts), self.num_perm), dtype=np.uint32)
+        for p in range(self.num_perm):
+            # uint64 arithmetic wraps, which is the mod 2**64 the scheme wants
+            hashed = (self._a[p] * values + self._b[p]) >> np.uint64(32)
+            signatures[:, p] = np.minimum.reduceat(hashed, offsets)
+        return signatures
+
+    def band_keys(self, signatures):
+        """One uint64 key per (text, band); equal keys mean a candidate pair."""
+        banded = signatures[:, : self.bands * self.rows].reshape(
+            len(signatures), self.bands, self.rows
+        )
+        return (banded.astype(np.uint64) * self._band_mix).sum(axis=2)
+
+
+class ComplaintClusters:
+    """Negative comments grouped by near-duplicate text, updated per delta.
+
+    Each distinct text is MinHashed once and placed by locality-sensitive
+    hashing: texts that share a band key with an earlier text and whose
+    signatures agree on at least ``threshold`` of their positions join its
+    cluster (union-find), so the cost follows the number of new distinct
+    texts rather than all pairs. Per-text counts, likes and first/last dates
+    are folded forward; cluster totals are rebuilt from them after each
+    change.
+    """
+
+    def __init__(self, threshold=CLUSTER_THRESHOLD, hasher=None):
+        self.threshold = threshold
+        self.hasher = hasher or MinHasher()
+        self._clear()
+
+    def _clear(self):
+        self._nodes = {}  # text -> node id
+        self._texts = []
+        self._parent = []
+        self._signatures = np.empty((0, self.hasher.num_perm), dtype=np.uint32)
+        self._buckets = [{} for _ in range(self.hasher.bands)]
+        self._stats = pd.DataFrame(
+            {
+                "comments": pd.Series(dtype="int64"),
+                "likes": pd.Series(dtype="int64"),
+                "first_seen": pd.Series(dtype="datetime64[ns]"),
+                "last_seen": pd.Series(dtype="datetime64[ns]"),
+            }
+        )
+        self._clusters = pd.DataFrame(columns=CLUSTER_COLUMNS)
+
+    def apply(self, delta, loader):
+        if delta.reset:
+            self._clear()
+            comments = loader.comments
+        else:
+            comments = delta.comments
+        negative = comments[comments["sentiment_label"] == "Negative"]
+        if negative.empty:
+            return
+        self.add(
+            negative.groupby(negative["comment_text"].astype(str), sort=False).agg(
+                comments=("likes", "size"),
+                likes=("likes", "sum"),
+                first_seen=("date", "min"),
+                last_seen=("date", "max"),
+            )
+        )
+
+    def add(self, text_stats):
+        """Fold per-text ``comments``/``likes``/``first_seen``/``last_seen`` in."""
+        new_texts = [text for text in text_stats.index if text not in self._nodes]
+        if new_texts:
+            self._place(new_texts)
+
+        nodes = text_stats.index.map(self._nodes)
+        incoming = text_stats.set_axis(nodes)
+        stats = self._stats.reindex(range(len(self._texts)))
+        stats.loc[incoming.index, "comments"] = (
+            stats.loc[incoming.index, "comments"].fillna(0) + incoming["comments"]
+        )
+        stats.loc[incoming.index, "likes"] = (
+            stats.loc[incoming.index, "likes"].fillna(0) + incoming["likes"]
+        )
+        stats.loc[incoming.index, "first_seen"] = np.fmin(
+            stats.loc[incoming.index, "first_seen"], incoming["first_seen"]
+        )
+        stats.loc[incoming.index, "last_seen"] = np.fmax(
+            stats.loc[incoming.index, "last_seen"], incoming["last_seen"]
+        )
+        self._stats = stats
+        self._publish()
+
+    def _place(self, texts):
+        first = len(self._texts)
+        signatures = self.hasher.signatures(texts)
+        keys = self.hasher.band_keys(signatures)
+        self._texts += texts
+        self._parent += range(first, first + len(texts))
+        self._signatures = np.concatenate([self._signatures, signatures])
+        for offset, text in enumerate(texts):
+            node = first + offset
+            self._nodes[text] = node
+            for band, key in enumerate(keys[offset].tolist()):
+                other = self._buckets[band].setdefault(key, node)
+                if other != node and self._similar(node, other):
+                    self._union(node, other)
+
+    def _similar(self, a, b):
+        agreement = np.mean(self._signatures[a] == self._signatures[b])
+        return agreement >= self.threshold
+
+    def _find(self, node):
+        parent = self._parent
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    def _union(self, a, b):
+        a, b = self._find(a), self._find(b)
+        if a != b:
+            self._parent[max(a, b)] = min(a, b)
+
+    def _publish(self):
+        stats = self._stats.assign(
+            root=[self._find(node) for node in range(len(self._texts))],
+            text=self._texts,
+        )
+        # The most common wording names the cluster.
+        examples = stats.sort_values("comments", ascending=False).drop_duplicates(
+            "root"
+        )
+        clusters = stats.groupby("root").agg(
+            comments=("comments", "sum"),
+            likes=("likes", "sum"),
+            first_seen=("first_seen", "min"),
+            last_seen=("last_seen", "max"),
+            variants=("text", "size"),
+        )
+        clusters["complaint"] = examples.set_index("root")["text"]
+        self._clusters = (
+            clusters.astype({"comments": "int64", "likes": "int64"})
+            .sort_values(["comments", "likes"], ascending=False)
+            .reset_index(drop=True)[CLUSTER_COLUMNS]
+        )
+
+    # ------------------
+    # Queries
+    # ------------------
+    def complaint_clusters(self, limit=CLUSTER_TOP_N):
+        return self._clusters.head(limit)
@@ -0,0 +1,142 @@
+import argparse
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+from settings import COMMENTS_CSV, DATA_FORMAT, POSTS_CSV
+from tail import parse_dates
+
+# =====================================
+# Typed Schemas
+# =====================================
+_CATEGORY = pa.dictionary(pa.int8(), pa.string())
+
+POSTS_SCHEMA = pa.schema(
+    [
+        ("post_id", pa.int64()),
+        ("platform", _CATEGORY),
+        ("post_text", pa.string()),
+        ("post_type", _CATEGORY),
+        ("likes", pa.int32()),
+        ("shares", pa.int32()),
+        ("comments", pa.int32()),
+        ("date", pa.timestamp("ms")),
+    ]
+)
+
+COMMENTS_SCHEMA = pa.schema(
+    [
+        ("comment_id", pa.int64()),
+        ("post_id", pa.int64()),
+        ("platform", _CATEGORY),
+        ("comment_text", pa.string()),
+        ("user", pa.string()),
+        ("likes", pa.int32()),
+        ("date", pa.timestamp("ms")),
+    ]
+)
+
+EXTENSIONS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+
+def columnar_path(csv_path, data_format):
+    return os.path.splitext(csv_path)[0] + EXTENSIONS[data_format]
+
+
+# =====================================
+# One-time Conversion
+# =====================================
+def convert_csv(csv_path, schema, data_format="parquet"):
+    """Write a typed Parquet or Arrow IPC copy of ``csv_path`` next to it."""
+    plain_types = {
+        field.name: (
+            field.type.value_type if pa.types.is_dictionary(field.type) else field.type
+        )
+        for field in schema
+    }
+    table = pacsv.read_csv(
+        csv_path,
+        convert_options=pacsv.ConvertOptions(
+            column_types=plain_types, include_columns=schema.names
+        ),
+    )
+    table = table.cast(schema).unify_dictionaries()
+
+    out_path = columnar_path(csv_path, data_format)
+    if data_format == "parquet":
+        pq.write_table(table, out_path, row_group_size=1_000_000)
+    else:
+        with ipc.new_file(out_path, table.schema) as writer:
+            writer.write_table(table, max_chunksize=1_000_000)
+    return out_path
+
+
+# =====================================
+# Loading
+# =====================================
+def read_columnar(path, columns=None, filters=None):
+    """Read a Parquet or Arrow IPC file, projecting ``columns`` when given.
+
+    ``filters`` is a ``pyarrow.compute`` expression; Parquet pushes it down to
+    skip row groups. Dictionary columns come back as pandas categoricals and
+    dates as datetime64, so nothing needs converting after load.
+    """
+    if path.endswith(EXTENSIONS["arrow"]):
+        table = ipc.open_file(pa.memory_map(path)).read_all()
+        if filters is not None:
+            table = table.filter(filters)
+        if columns is not None:
+            table = table.select(columns)
+    else:
+        table = pq.read_table(path, columns=columns, filters=filters, memory_map=True)
+    return table.to_pandas(date_as_object=False)
+
+
+def resolve_format(csv_path, data_format):
+    if data_format != "auto":
+        return data_format
+    for candidate in EXTENSIONS:
+        path = columnar_path(csv_path, candidate)
+        if os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(
+            csv_path
+        ):
+            return candidate
+    return "csv"
+
+
+def resolve_source(csv_path, data_format):
+    """Return ``(format, path)`` of the file to read for ``csv_path``.
+
+    With ``auto`` this can change between calls: appending to the CSV makes
+    its columnar copy stale until it is converted again.
+    """
+    data_format = resolve_format(csv_path, data_format)
+    if data_format == "csv":
+        return data_format, csv_path
+    return data_format, columnar_path(csv_path, data_format)
+
+
+def read_frame(csv_path, columns=None, data_format=DATA_FORMAT):
+    data_format = resolve_format(csv_path, data_format)
+    if data_format == "csv":
+        frame = pd.read_csv(csv_path, usecols=columns)
+        return frame if "date" not in frame else parse_dates(frame)
+    return read_columnar(columnar_path(csv_path, data_format), columns=columns)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Convert the post and comment CSVs to a typed columnar format."
+    )
+    parser.add_argument("--format", choices=sorted(EXTENSIONS), default="parquet")
+    args = parser.parse_args()
+
+    for csv_path, schema in (
+        (POSTS_CSV, POSTS_SCHEMA),
+        (COMMENTS_CSV, COMMENTS_SCHEMA),
+    ):
+        print(f"{csv_path} -> {convert_csv(csv_path, schema, args.format)}")
@@ -0,0 +1,90 @@
+import pandas as pd
+
+from settings import COMPACT_CATEGORY_RATIO
+
+# =====================================
+# In-memory Compaction
+# =====================================
+DATE_COLUMNS = ["date"]
+
+
+def footprint(frame):
+    """Bytes held by each column, counting the Python strings in object columns."""
+    return frame.memory_usage(deep=True, index=False)
+
+
+class Compactor:
+    """Shrinks each batch of rows before it is appended to a loader frame.
+
+    Object columns whose distinct values are at most ``category_ratio`` of
+    the rows (platforms, labels, templated text) become categoricals; the
+    choice is made on the first batch and then kept, so appended batches
+    fold together with ``union_categoricals``. Integers and floats are
+    downcast to the narrowest type that holds the batch; ``concat`` widens
+    again if a later batch needs it.
+
+    With ``track`` set, the loaded size of every batch is added to
+    ``before`` for the footprint report.
+    """
+
+    def __init__(self, category_ratio=COMPACT_CATEGORY_RATIO, track=False):
+        self.category_ratio = category_ratio
+        self.track = track
+        self.reset()
+
+    def reset(self):
+        self.categorical = {}
+        self.before = pd.Series(dtype="int64")
+
+    def compact(self, frame):
+        if self.track:
+            self.before = self.before.add(footprint(frame), fill_value=0)
+        compacted = {}
+        for column, values in frame.items():
+            if column in DATE_COLUMNS:
+                compacted[column] = pd.to_datetime(values)
+            elif isinstance(values.dtype, pd.CategoricalDtype):
+                self.categorical.setdefault(column, True)
+                compacted[column] = values
+            elif values.dtype == object:
+                # An empty batch (a header-only file) says nothing yet.
+                if column not in self.categorical and len(values):
+                    self.categorical[column] = (
+                        values.nunique() <= self.category_ratio * len(values)
+                    )
+                compacted[column] = (
+                    values.astype("category")
+                    if self.categorical.get(column)
+                    else values
+                )
+            elif pd.api.types.is_bool_dtype(values):
+                compacted[column] = values
+            elif pd.api.types.is_integer_dtype(values):
+                compacted[column] = pd.to_numeric(values, downcast="integer")
+            elif pd.api.types.is_float_dtype(values):
+                compacted[column] = pd.to_numeric(values, downcast="float")
+            else:
+                compacted[column] = values
+        return pd.DataFrame(compacted, index=frame.index)
+
+
+def footprint_report(frames, compactors):
+    """Per-column bytes as loaded and as held, for each named frame."""
+    reports = []
+    for name, frame in frames.items():
+        after = footprint(frame)
+        before = compactors[name].before.reindex(after.index)
+        reports.append(
+            pd.DataFrame(
+                {
+                    "frame": name,
+                    "column": after.index,
+                    "dtype": frame.dtypes.astype(str).to_numpy(),
+                    "bytes_before": before.to_numpy(),
+                    "bytes_after": after.to_numpy(),
+                }
+            )
+        )
+    report = pd.concat(reports, ignore_index=True)
+    report["ratio"] = (report["bytes_after"] / report["bytes_before"]).round(3)
+    return report
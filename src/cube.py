@@ -0,0 +1,126 @@
+import pandas as pd
+
+from keywords import URGENT_COLUMN, topic_column
+from settings import TECH_TOPICS
+
+# =====================================
+# Pre-aggregated Analytics Cube
+# =====================================
+POST_DIMENSIONS = ["platform", "post_type", "day"]
+COMMENT_DIMENSIONS = ["platform", "post_type", "sentiment_label", "day"]
+ENGAGEMENT = ["likes", "shares", "comments"]
+
+
+def _flag_columns():
+    return [URGENT_COLUMN] + [topic_column(topic) for topic in TECH_TOPICS]
+
+
+def _day(dates):
+    # A header-only source comes back with an untyped, empty date column.
+    return pd.to_datetime(dates).dt.normalize()
+
+
+def _aggregate_posts(posts):
+    rows = posts.assign(day=_day(posts["date"]), posts=1)
+    return _rollup(rows[POST_DIMENSIONS + ["posts"] + ENGAGEMENT], POST_DIMENSIONS)
+
+
+def _aggregate_comments(comments, post_types):
+    rows = comments.assign(
+        post_type=comments["post_id"].map(post_types),
+        day=_day(comments["date"]),
+        comment_likes=comments["likes"],
+        comment_count=1,
+    )
+    measures = ["comment_count", "comment_likes"] + _flag_columns()
+    return _rollup(rows[COMMENT_DIMENSIONS + measures], COMMENT_DIMENSIONS)
+
+
+def _rollup(rows, dimensions):
+    # Dimensions go to plain strings so partial cubes from different batches
+    # (whose categoricals may differ) fold together without surprises.
+    rows = rows.astype({column: object for column in dimensions if column != "day"})
+    # Measures of an empty batch can arrive untyped (object or category).
+    rows = rows.astype(
+        {
+            column: "int64"
+            for column in rows.columns.difference(dimensions)
+            if not pd.api.types.is_numeric_dtype(rows[column])
+        }
+    )
+    return rows.groupby(dimensions, dropna=False, sort=False).sum().reset_index()
+
+
+class AnalyticsCube:
+    """Counts and engagement sums by platform x post_type x sentiment x day.
+
+    Registered as an aggregate on ``IncrementalLoader`` so it is built once
+    per data version and then folded forward with each appended delta. Every
+    dashboard chart reads from these few thousand rows instead of the raw
+    frames.
+    """
+
+    def __init__(self):
+        self.posts = None
+        self.comments = None
+
+    def apply(self, delta, loader):
+        if delta.reset or self.posts is None:
+            self.posts = _aggregate_posts(loader.posts)
+            self.comments = _aggregate_comments(
+                loader.comments, loader.posts.set_index("post_id")["post_type"]
+            )
+            return
+        if not delta.posts.empty:
+            self.posts = _rollup(
+                pd.concat([self.posts, _aggregate_posts(delta.posts)]), POST_DIMENSIONS
+            )
+        if not delta.comments.empty:
+            post_types = loader.posts.set_index("post_id")["post_type"]
+            self.comments = _rollup(
+                pd.concat(
+                    [self.comments, _aggregate_comments(delta.comments, post_types)]
+                ),
+                COMMENT_DIMENSIONS,
+            )
+
+    # ------------------
+    # Queries
+    # ------------------
+    def summary(self):
+        total_posts = int(self.posts["posts"].sum())
+        total_comments = int(self.comments["comment_count"].sum())
+        by_label = self.sentiment_counts()
+        negative = self.comments[self.comments["sentiment_label"] == "Negative"]
+        engagement = self.posts[ENGAGEMENT].sum()
+        return {
+            "total_posts": total_posts,
+            "urgent_issues": int(negative[URGENT_COLUMN].sum()),
+            # Default to 0% if no comments are available
+            "positive_percentage": (
+                int(by_label.get("Positive", 0) / total_comments * 100)
+                if total_comments
+                else 0
+            ),
+            "avg_engagement": (
+                round(engagement.sum() / (3 * total_posts)) if total_posts else 0
+            ),
+        }
+
+    def sentiment_counts(self):
+        return self.comments.groupby("sentiment_label")["comment_count"].sum()
+
+    def sentiment_by_platform(self):
+        return (
+            self.comments.groupby(["platform", "sentiment_label"])["comment_count"]
+            .sum()
+            .unstack()
+        )
+
+    def topic_counts(self, sentiment_label=None):
+        comments = self.comments
+        if sentiment_label is not None:
+            comments = comments[comments["sentiment_label"] == sentiment_label]
+        return {
+            topic: int(comments[topic_column(topic)].sum()) for topic in TECH_TOPICS
+        }
@@ -1,122 +1,268 @@
-import pandas as pd
+import argparse
+import math
+import os
+from datetime import date, timedelta
+
 import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 from faker import Faker
-from datetime import timedelta
 
-fake = Faker()
-np.random.seed(42)
+from columnar import COMMENTS_SCHEMA, POSTS_SCHEMA, columnar_path
+from settings import COMMENTS_CSV, POSTS_CSV
 
 # =====================================
-# Generate 500 Business-Tech Posts
+# Distributions & Templates
 # =====================================
-platforms = ["LinkedIn"] * 250 + ["Twitter"] * 150 + ["Facebook"] * 100
-post_types = (
-    ["whitepaper"] * 150
-    + ["case_study"] * 125
-    + ["alert"] * 100
-    + ["webinar"] * 75
-    + ["product_update"] * 50
+PLATFORMS = np.array(["LinkedIn", "Twitter", "Facebook"], dtype=object)
+PLATFORM_WEIGHTS = [250 / 500, 150 / 500, 100 / 500]
+
+# Platform-specific engagement, [low, high) per platform above
+LIKES_RANGE = np.array([[200, 5000], [100, 1500], [50, 1000]])
+SHARES_RANGE = np.array([[100, 2000], [20, 500], [10, 300]])
+
+POST_TYPES = np.array(
+    ["whitepaper", "case_study", "alert", "webinar", "product_update"], dtype=object
 )
+POST_TYPE_WEIGHTS = [150 / 500, 125 / 500, 100 / 500, 75 / 500, 50 / 500]
+
+SENTIMENT_WEIGHTS = [5 / 10, 3 / 10, 2 / 10]  # positive, neutral, negative
+COMMENTS_PER_POST = (3, 6)  # 3-5 comments per post
+MEAN_COMMENTS_PER_POST = 4
+
+TECH_TERMS = ["Kubernetes", "LLM", "SIEM", "IaC", "Zero Trust"]
+ROLES = ["CTO", "CIO", "Security Engineer", "Cloud Architect"]
+
+
+def _pick(rng, options, n):
+    return np.asarray(options, dtype=object)[rng.integers(0, len(options), n)]
+
 
-posts = []
-for post_id in range(1, 501):
-    platform = np.random.choice(platforms)
-    post_type = np.random.choice(post_types)
-
-    # Platform-specific engagement
-    if platform == "LinkedIn":
-        likes = np.random.randint(200, 5000)
-        shares = np.random.randint(100, 2000)
-    elif platform == "Twitter":
-        likes = np.random.randint(100, 1500)
-        shares = np.random.randint(20, 500)
-    else:  # Facebook
-        likes = np.random.randint(50, 1000)
-        shares = np.random.randint(10, 300)
-
-    # Business-focused post content (now includes product_update)
-    content_map = {
-        "whitepaper": f"{fake.random_element(['AI-Driven','Cloud-Native'])} {fake.random_element(['Digital Transformation','Compliance Framework'])} Whitepaper",
-        "case_study": f"Case Study: {fake.company()} achieved {np.random.randint(40,95)}% {fake.random_element(['cost reduction','fraud prevention','API latency improvement'])}",
-        "alert": f"Urgent: {fake.random_element(['Zero-Day','DDoS'])} mitigation strategy for {fake.random_element(['Azure','AWS','Hybrid Clouds'])}",
-        "webinar": f"Live Session: {fake.random_element(['Generative AI Governance','SOC2 Compliance'])} Best Practices",
-        "product_update": f"New Release: {fake.random_element(['v3.2','v4.0'])} introduces {fake.random_element(['real-time threat detection','multi-cloud cost analytics'])}",
+def _ints(rng, low, high, n):
+    return rng.integers(low, high, n).astype(str).astype(object)
+
+
+# Each template renders ``n`` strings at once from vectorized draws.
+POST_TEMPLATES = {
+    "whitepaper": lambda rng, n, pools: _pick(rng, ["AI-Driven", "Cloud-Native"], n)
+    + " "
+    + _pick(rng, ["Digital Transformation", "Compliance Framework"], n)
+    + " Whitepaper",
+    "case_study": lambda rng, n, pools: "Case Study: "
+    + _pick(rng, pools["companies"], n)
+    + " achieved "
+    + _ints(rng, 40, 95, n)
+    + "% "
+    + _pick(rng, ["cost reduction", "fraud prevention", "API latency improvement"], n),
+    "alert": lambda rng, n, pools: "Urgent: "
+    + _pick(rng, ["Zero-Day", "DDoS"], n)
+    + " mitigation strategy for "
+    + _pick(rng, ["Azure", "AWS", "Hybrid Clouds"], n),
+    "webinar": lambda rng, n, pools: "Live Session: "
+    + _pick(rng, ["Generative AI Governance", "SOC2 Compliance"], n)
+    + " Best Practices",
+    "product_update": lambda rng, n, pools: "New Release: "
+    + _pick(rng, ["v3.2", "v4.0"], n)
+    + " introduces "
+    + _pick(rng, ["real-time threat detection", "multi-cloud cost analytics"], n),
+}
+
+COMMENT_TEMPLATES = [
+    # positive
+    [
+        lambda rng, n: "Deployed this across our "
+        + _ints(rng, 10, 50, n)
+        + " locations!",
+        lambda rng, n: _pick(rng, TECH_TERMS, n) + " integration works flawlessly",
+        lambda rng, n: "Our "
+        + _pick(rng, ["auditors", "board"], n)
+        + " loved the compliance features",
+    ],
+    # neutral
+    [
+        lambda rng, n: "Pricing for "
+        + _pick(rng, ["non-profits", "enterprises"], n)
+        + "?",
+        lambda rng, n: np.full(n, "Terraform provider available?", dtype=object),
+        lambda rng, n: "Roadmap for "
+        + _pick(rng, ["FedRAMP", "GDPR"], n)
+        + " certification?",
+    ],
+    # negative
+    [
+        lambda rng, n: _pick(rng, TECH_TERMS, n)
+        + " compatibility issues in v"
+        + _pick(rng, ["2.1", "3.0"], n),
+        lambda rng, n: "SLA breach during " + _pick(rng, ["migration", "pen test"], n),
+        lambda rng, n: "Support ticket #"
+        + _ints(rng, 1000, 10000, n)
+        + " still unresolved",
+    ],
+]
+
+
+def _render(rng, groups, templates):
+    """Fill one string per row from the template chosen by ``groups``."""
+    text = np.empty(len(groups), dtype=object)
+    for group, template in enumerate(templates):
+        rows = np.flatnonzero(groups == group)
+        if len(rows):
+            text[rows] = template(rng, len(rows))
+    return text
+
+
+# =====================================
+# Chunked Generation
+# =====================================
+def _make_pools(seed):
+    # Faker is slow per call, so names are drawn from pre-generated pools.
+    fake = Faker()
+    Faker.seed(seed)
+    return {
+        "companies": [fake.company() for _ in range(2000)],
+        "users": [fake.user_name() for _ in range(20000)],
     }
-    post_text = content_map[post_type]  # Now handles all post types
 
-    posts.append(
+
+def _posts_chunk(rng, pools, first_id, n, start_date):
+    platform = rng.choice(len(PLATFORMS), n, p=PLATFORM_WEIGHTS)
+    post_type = rng.choice(len(POST_TYPES), n, p=POST_TYPE_WEIGHTS)
+    templates = [
+        lambda rng, k, name=name: POST_TEMPLATES[name](rng, k, pools)
+        for name in POST_TYPES
+    ]
+    return pd.DataFrame(
         {
-            "post_id": post_id,
-            "platform": platform,
-            "post_text": post_text,
-            "post_type": post_type,
-            "likes": likes,
-            "shares": shares,
-            "comments": np.random.randint(20, 500),
-            "date": fake.date_between(start_date="-1y", end_date="today"),
+            "post_id": np.arange(first_id, first_id + n),
+            "platform": PLATFORMS[platform],
+            "post_text": _render(rng, post_type, templates),
+            "post_type": POST_TYPES[post_type],
+            "likes": rng.integers(LIKES_RANGE[platform, 0], LIKES_RANGE[platform, 1]),
+            "shares": rng.integers(
+                SHARES_RANGE[platform, 0], SHARES_RANGE[platform, 1]
+            ),
+            "comments": rng.integers(20, 500, n),
+            "date": np.datetime64(start_date) + rng.integers(0, 366, n),
         }
     )
 
-posts_df = pd.DataFrame(posts)
+
+def _comments_chunk(rng, pools, posts, first_id):
+    per_post = rng.integers(*COMMENTS_PER_POST, len(posts))
+    parent = np.repeat(np.arange(len(posts)), per_post)
+    n = len(parent)
+    sentiment = rng.choice(3, n, p=SENTIMENT_WEIGHTS)
+    template = rng.integers(0, 3, n)
+
+    text = np.empty(n, dtype=object)
+    for group, templates in enumerate(COMMENT_TEMPLATES):
+        rows = np.flatnonzero(sentiment == group)
+        text[rows] = _render(rng, template[rows], templates)
+
+    return pd.DataFrame(
+        {
+            "comment_id": np.arange(first_id, first_id + n),
+            "post_id": posts["post_id"].to_numpy()[parent],
+            "platform": posts["platform"].to_numpy()[parent],
+            "comment_text": text,
+            "user": "@" + _pick(rng, pools["users"], n) + "_" + _pick(rng, ROLES, n),
+            "likes": rng.integers(1, 100, n),
+            "date": posts["date"].to_numpy()[parent]
+            + rng.integers(0, 3, n).astype("timedelta64[D]"),
+        }
+    )
+
+
+def generate(comments=None, posts=500, seed=42, chunk_size=500_000):
+    """Yield ``(posts_df, comments_df)`` chunks of roughly ``chunk_size`` comments.
+
+    With ``comments`` set, posts are added until exactly that many comments
+    exist; otherwise ``posts`` posts are generated with 3-5 comments each.
+    """
+    rng = np.random.default_rng(seed)
+    pools = _make_pools(seed)
+    start_date = date.today() - timedelta(days=365)
+    posts_per_chunk = max(1, chunk_size // MEAN_COMMENTS_PER_POST)
+
+    next_post, next_comment = 1, 1
+    while True:
+        if comments is not None:
+            remaining = comments - (next_comment - 1)
+            if remaining <= 0:
+                return
+            n = min(posts_per_chunk, math.ceil(remaining / COMMENTS_PER_POST[0]))
+        else:
+            n = min(posts_per_chunk, posts - (next_post - 1))
+            if n <= 0:
+                return
+
+        posts_df = _posts_chunk(rng, pools, next_post, n, start_date)
+        comments_df = _comments_chunk(rng, pools, posts_df, next_comment)
+        if comments is not None and len(comments_df) > remaining:
+            # Trim to the target, dropping posts past the last kept comment.
+            comments_df = comments_df.iloc[:remaining]
+            last_post = comments_df["post_id"].iloc[-1]
+            posts_df = posts_df[posts_df["post_id"] <= last_post]
+
+        next_post += len(posts_df)
+        next_comment += len(comments_df)
+        yield posts_df, comments_df
+
 
 # =====================================
-# Generate 1500+ B2B Comments
+# Output
 # =====================================
-comments = []
-comment_id = 1
-
-tech_terms = ["Kubernetes", "LLM", "SIEM", "IaC", "Zero Trust"]
-roles = ["CTO", "CIO", "Security Engineer", "Cloud Architect"]
-
-for _, post in posts_df.iterrows():
-    num_comments = np.random.randint(3, 6)
-
-    for _ in range(num_comments):
-        sentiment = np.random.choice(
-            ["positive"] * 5 + ["neutral"] * 3 + ["negative"] * 2
-        )
-        user = f"@{fake.user_name()}_{fake.random_element(roles)}"
-
-        if sentiment == "positive":
-            text = fake.random_element(
-                [
-                    f"Deployed this across our {np.random.randint(10,50)} locations!",
-                    f"{fake.random_element(tech_terms)} integration works flawlessly",
-                    "Our {fake.random_element(['auditors','board'])} loved the compliance features",
-                ]
-            )
-        elif sentiment == "negative":
-            text = fake.random_element(
-                [
-                    f"{fake.random_element(tech_terms)} compatibility issues in v{np.random.choice(['2.1','3.0'])}",
-                    "SLA breach during {fake.random_element(['migration','pen test'])}",
-                    "Support ticket #{fake.random_int(1000,9999)} still unresolved",
-                ]
-            )
-        else:
-            text = fake.random_element(
-                [
-                    f"Pricing for {fake.random_element(['non-profits','enterprises'])}?",
-                    "Terraform provider available?",
-                    "Roadmap for {fake.random_element(['FedRAMP','GDPR'])} certification?",
-                ]
-            )
-
-        comments.append(
-            {
-                "comment_id": comment_id,
-                "post_id": post["post_id"],
-                "platform": post["platform"],
-                "comment_text": text,
-                "user": user,
-                "likes": np.random.randint(1, 100),
-                "date": post["date"] + timedelta(days=np.random.randint(0, 3)),
-            }
-        )
-        comment_id += 1
-
-comments_df = pd.DataFrame(comments)
-
-# Save to CSV
-posts_df.to_csv("mock_posts_biz.csv", index=False)
-comments_df.to_csv("mock_comments_biz.csv", index=False)
+def write(chunks, out_dir=".", data_format="csv"):
+    """Stream generated chunks to CSV or Parquet; returns the written paths."""
+    targets = [
+        (os.path.join(out_dir, POSTS_CSV), POSTS_SCHEMA),
+        (os.path.join(out_dir, COMMENTS_CSV), COMMENTS_SCHEMA),
+    ]
+    paths = [
+        path if data_format == "csv" else columnar_path(path, data_format)
+        for path, _ in targets
+    ]
+    writers = [None, None]
+    try:
+        for chunk_number, frames in enumerate(chunks):
+            for i, (frame, (_, schema)) in enumerate(zip(frames, targets)):
+                if data_format == "csv":
+                    frame.to_csv(
+                        paths[i],
+                        mode="w" if chunk_number == 0 else "a",
+                        header=chunk_number == 0,
+                        index=False,
+                        date_format="%Y-%m-%d",
+                    )
+                    continue
+                if writers[i] is None:
+                    writers[i] = pq.ParquetWriter(paths[i], schema)
+                writers[i].write_table(
+                    pa.Table.from_pandas(frame, preserve_index=False).cast(schema)
+                )
+    finally:
+        for writer in writers:
+            if writer is not None:
+                writer.close()
+    return paths
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Generate synthetic business-tech posts and comments."
+    )
+    size = parser.add_mutually_exclusive_group()
+    size.add_argument("--comments", type=int, help="target number of comments")
+    size.add_argument("--posts", type=int, default=500, help="number of posts")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--out-dir", default=".")
+    parser.add_argument(
+        "--chunk-size", type=int, default=500_000, help="comments per written chunk"
+    )
+    args = parser.parse_args()
+
+    chunks = generate(args.comments, args.posts, args.seed, args.chunk_size)
+    for path in write(chunks, args.out_dir, args.format):
+        print(f"Wrote {path}")
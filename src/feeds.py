@@ -0,0 +1,502 @@
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import sqlite3
+
+import pandas as pd
+
+from columnar import COMMENTS_SCHEMA, POSTS_SCHEMA
+from polarity_cache import PolarityCache
+from sentiment import SCORER_VERSION, score_polarity
+from settings import (
+    COMMENTS_CSV,
+    FEED_BATCH_SIZE,
+    FEED_DROP_DIR,
+    FEED_POLL_SECONDS,
+    FEED_QUEUE_SIZE,
+    FEED_STATE_PATH,
+    POSTS_CSV,
+)
+from tail import START, FileTail, TailPosition
+
+logger = logging.getLogger("social_media_analytics.feeds")
+
+# =====================================
+# Platform Exports
+# =====================================
+# Export field -> schema column. Fields not mapped here or named like a
+# schema column are dropped; ``id`` and ``post_id`` stay platform-native
+# until the writer assigns canonical ids.
+COMMON_FIELDS = {
+    "id": "native_id",
+    "post_id": "native_post_id",
+    "type": "post_type",
+    "created_at": "date",
+}
+FIELD_MAPS = {
+    "LinkedIn": {"reactions": "likes", "reposts": "shares", "author": "user"},
+    "Twitter": {
+        "favorites": "likes",
+        "retweets": "shares",
+        "replies": "comments",
+        "handle": "user",
+    },
+    "Facebook": {"reactions": "likes", "author": "user"},
+}
+KINDS = {
+    "posts": ("post_text", POSTS_SCHEMA.names),
+    "comments": ("comment_text", COMMENTS_SCHEMA.names),
+}
+# Comments whose post has not arrived yet are held back, up to this many.
+MAX_PENDING_COMMENTS = 100_000
+
+
+def _native_id(value):
+    return None if value is None or value == "" else str(value)
+
+
+def normalize(records, platform, kind):
+    """Map one platform's export records onto the posts or comments schema."""
+    text_column, columns = KINDS[kind]
+    frame = pd.DataFrame.from_records(records).rename(
+        columns={**COMMON_FIELDS, **FIELD_MAPS[platform], "text": text_column}
+    )
+    required = ["native_id", "date"] + (
+        ["native_post_id"] if kind == "comments" else []
+    )
+    # Native ids are read off the records as text: once one record lacks an
+    # id, pandas would hold the rest as floats and "2" would become "2.0".
+    for field, column in COMMON_FIELDS.items():
+        if column in required and column != "date":
+            frame[column] = [_native_id(record.get(field)) for record in records]
+    for column in required:
+        if column not in frame:
+            frame[column] = None
+    frame["date"] = (
+        pd.to_datetime(frame["date"], utc=True, format="ISO8601", errors="coerce")
+        .dt.tz_localize(None)
+        .dt.floor("s")
+    )
+    invalid = frame[required].isna().any(axis=1)
+    if invalid.any():
+        logger.warning(
+            "skipped %d %s %s records without %s",
+            invalid.sum(),
+            platform,
+            kind,
+            "/".join(required),
+        )
+        frame = frame[~invalid].copy()
+
+    frame["platform"] = platform
+    # Canonical ids are assigned by the writer.
+    for column in columns:
+        if column in ("likes", "shares", "comments"):
+            counts = frame.get(column, pd.Series(0, index=frame.index))
+            frame[column] = pd.to_numeric(counts, errors="coerce").fillna(0).astype(int)
+        elif column not in frame and not column.endswith("_id"):
+            frame[column] = ""
+    keep = [c for c in frame if c in columns or c.startswith("native_")]
+    return frame[keep]
+
+
+class _Export:
+    """One ``<platform>_<kind>.jsonl`` file in the drop directory."""
+
+    def __init__(self, drop_dir, platform, kind):
+        self.platform = platform
+        self.kind = kind
+        self.path = os.path.join(drop_dir, f"{platform.lower()}_{kind}.jsonl")
+        self._tail = FileTail(self.path)
+
+    def read(self, position, max_rows):
+        """Return ``(rows, new_position)`` for complete lines past ``position``."""
+        if not os.path.exists(self.path):
+            return None, position
+        lines, position, replaced = next(self._tail.blocks(position, max_rows))
+        if replaced:
+            logger.warning("%s was rewritten; reading it from the start", self.path)
+        records = []
+        for line in lines:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                logger.warning("skipped malformed line in %s", self.path)
+        rows = normalize(records, self.platform, self.kind) if records else None
+        return None if rows is None or rows.empty else rows, position
+
+
+class _State:
+    """Read positions, id counters, native -> canonical id maps and pending comments.
+
+    Comments waiting for their post are kept here as well, so they survive a
+    restart even though the export they came from has been read past.
+    """
+
+    def __init__(self, path):
+        self._conn = sqlite3.connect(path)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS positions (
+                path TEXT PRIMARY KEY,
+                offset INTEGER,
+                inode INTEGER,
+                digest TEXT
+            );
+            CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER);
+            CREATE TABLE IF NOT EXISTS post_ids (
+                platform TEXT,
+                native_id TEXT,
+                post_id INTEGER,
+                PRIMARY KEY (platform, native_id)
+            );
+            CREATE TABLE IF NOT EXISTS comment_ids (
+                platform TEXT,
+                native_id TEXT,
+                comment_id INTEGER,
+                PRIMARY KEY (platform, native_id)
+            );
+            CREATE TABLE IF NOT EXISTS pending (
+                platform TEXT,
+                native_id TEXT,
+                record TEXT NOT NULL,
+                PRIMARY KEY (platform, native_id)
+            );
+            """)
+        self.post_ids = {
+            (platform, native_id): post_id
+            for platform, native_id, post_id in self._conn.execute(
+                "SELECT platform, native_id, post_id FROM post_ids"
+            )
+        }
+
+    def position(self, path):
+        row = self._conn.execute(
+            "SELECT offset, inode, digest FROM positions WHERE path = ?", (path,)
+        ).fetchone()
+        return TailPosition(*row) if row else START
+
+    def counter(self, name, default):
+        row = self._conn.execute(
+            "SELECT value FROM counters WHERE name = ?", (name,)
+        ).fetchone()
+        return row[0] if row else default
+
+    def known_comments(self, rows):
+        """Mask of ``rows`` whose (platform, native_id) already has a comment_id."""
+        keys = list(zip(rows["platform"], rows["native_id"]))
+        known = set()
+        for start in range(0, len(keys), 400):
+            chunk = keys[start : start + 400]
+            known.update(
+                self._conn.execute(
+                    "SELECT platform, native_id FROM comment_ids "
+                    "WHERE (platform, native_id) IN "
+                    f"(VALUES {', '.join(['(?, ?)'] * len(chunk))})",
+                    [value for key in chunk for value in key],
+                )
+            )
+        return pd.Series([key in known for key in keys], index=rows.index)
+
+    def pending(self):
+        records = [
+            json.loads(record)
+            for (record,) in self._conn.execute("SELECT record FROM pending")
+        ]
+        if not records:
+            return None
+        rows = pd.DataFrame.from_records(records)
+        return rows.assign(date=pd.to_datetime(rows["date"], format="ISO8601"))
+
+    def save(self, positions, counters, new_post_ids, new_comment_ids, held, released):
+        """Record one write: ``held`` comments wait for their post, ``released`` don't."""
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO positions VALUES (?, ?, ?, ?)",
+                ((path, *position) for path, position in positions.items()),
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO counters VALUES (?, ?)", counters.items()
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO post_ids VALUES (?, ?, ?)",
+                ((*key, post_id) for key, post_id in new_post_ids.items()),
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO comment_ids VALUES (?, ?, ?)",
+                ((*key, comment_id) for key, comment_id in new_comment_ids.items()),
+            )
+            for rows in released:
+                self._conn.executemany(
+                    "DELETE FROM pending WHERE platform = ? AND native_id = ?",
+                    zip(rows["platform"], rows["native_id"]),
+                )
+            for rows in held:
+                records = rows.assign(
+                    date=rows["date"].dt.strftime("%Y-%m-%dT%H:%M:%S")
+                )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO pending VALUES (?, ?, ?)",
+                    (
+                        (record["platform"], record["native_id"], json.dumps(record))
+                        for record in records.to_dict("records")
+                    ),
+                )
+
+    def close(self):
+        self._conn.close()
+
+
+def _next_id(csv_path, id_column):
+    if not os.path.exists(csv_path) or os.path.getsize(csv_path) == 0:
+        return 1
+    ids = pd.read_csv(csv_path, usecols=[id_column])[id_column]
+    return int(ids.max()) + 1 if len(ids) else 1
+
+
+def _score(texts):
+    # Runs in a worker thread; SQLite connections stay on the thread that
+    # opened them.
+    with PolarityCache(SCORER_VERSION) as cache:
+        score_polarity(texts, cache=cache)
+        return cache.misses
+
+
+def _append_csv(frame, path):
+    header = not os.path.exists(path) or os.path.getsize(path) == 0
+    frame.to_csv(
+        path, mode="a", header=header, index=False, date_format="%Y-%m-%d %H:%M:%S"
+    )
+
+
+# =====================================
+# Ingestion Service
+# =====================================
+class FeedService:
+    """Tails per-platform exports into the post and comment CSVs.
+
+    Every export file has its own reader task; rows flow through bounded
+    queues, so a slow writer makes the readers wait instead of buffering
+    without limit. Per kind, a batcher cuts fixed-size micro-batches and
+    scores comment batches through the persistent polarity cache, so the
+    dashboard's own scoring of the same rows is a cache lookup. A single
+    writer assigns increasing canonical ids (the loader's watermarks rely on
+    them), reusing the first id for anything re-exported, and appends to the
+    CSVs the dashboard already tails. Read positions are saved after each
+    write together with the comments still waiting for their post, so a
+    restart resumes where it stopped.
+    """
+
+    def __init__(
+        self,
+        drop_dir=FEED_DROP_DIR,
+        posts_csv=POSTS_CSV,
+        comments_csv=COMMENTS_CSV,
+        batch_size=FEED_BATCH_SIZE,
+        queue_size=FEED_QUEUE_SIZE,
+        poll_seconds=FEED_POLL_SECONDS,
+        state_path=FEED_STATE_PATH,
+    ):
+        self.exports = [
+            _Export(drop_dir, platform, kind)
+            for platform in FIELD_MAPS
+            for kind in KINDS
+        ]
+        self.csv_paths = {"posts": posts_csv, "comments": comments_csv}
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.poll_seconds = poll_seconds
+        self.state_path = state_path
+        self.stats = {"posts": 0, "comments": 0, "scored": 0, "pending": 0}
+
+    async def run(self, follow=True):
+        """Ingest until cancelled, or until the exports are drained if not ``follow``."""
+        self._state = _State(self.state_path)
+        self._next_ids = {
+            "posts": self._state.counter(
+                "post_id", _next_id(self.csv_paths["posts"], "post_id")
+            ),
+            "comments": self._state.counter(
+                "comment_id", _next_id(self.csv_paths["comments"], "comment_id")
+            ),
+        }
+        pending = self._state.pending()
+        self._pending = [] if pending is None else [pending]
+        chunks = {kind: asyncio.Queue(self.queue_size) for kind in KINDS}
+        batches = asyncio.Queue(self.queue_size)
+        tasks = [
+            asyncio.create_task(self._read(export, chunks[export.kind], follow))
+            for export in self.exports
+        ]
+        readers = {
+            kind: sum(export.kind == kind for export in self.exports) for kind in KINDS
+        }
+        tasks += [
+            asyncio.create_task(self._batch(kind, chunks[kind], batches, readers[kind]))
+            for kind in KINDS
+        ]
+        try:
+            # A failing task raises here rather than leaving the others waiting.
+            await asyncio.gather(self._write(batches, len(KINDS)), *tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            self._state.close()
+        return self.stats
+
+    async def _read(self, export, queue, follow):
+        position = self._state.position(export.path)
+        while True:
+            rows, end = await asyncio.to_thread(export.read, position, self.batch_size)
+            if rows is not None:
+                # Blocks while the queue is full: backpressure on this source.
+                await queue.put((rows, export.path, end))
+            if end != position:
+                position = end
+                continue
+            if not follow:
+                break
+            await asyncio.sleep(self.poll_seconds)
+        await queue.put(None)
+
+    async def _batch(self, kind, queue, out, readers):
+        """Cut the chunks from all sources of ``kind`` into fixed-size batches."""
+        buffer, positions = [], {}
+        while readers:
+            try:
+                item = await asyncio.wait_for(queue.get(), self.poll_seconds)
+            except asyncio.TimeoutError:
+                item = False  # quiet sources: flush what we have
+            if item is None:
+                readers -= 1
+            elif item is not False:
+                rows, path, end = item
+                buffer.append(rows)
+                positions[path] = end
+            if not buffer:
+                continue
+            rows = pd.concat(buffer, ignore_index=True)
+            # Only whole batches go out, unless the sources have gone quiet.
+            flush = item is False or not readers
+            cut = len(rows) if flush else len(rows) // self.batch_size * self.batch_size
+            for start in range(0, cut, self.batch_size):
+                batch = rows.iloc[start : min(start + self.batch_size, cut)]
+                if kind == "comments":
+                    self.stats["scored"] += await asyncio.to_thread(
+                        _score, batch["comment_text"]
+                    )
+                # Positions are saved with the batch that empties the buffer.
+                emptied = start + self.batch_size >= len(rows)
+                await out.put((kind, batch, positions if emptied else {}))
+            if cut == len(rows):
+                buffer, positions = [], {}
+            else:
+                buffer = [rows.iloc[cut:]]
+        await out.put(None)
+
+    async def _write(self, batches, producers):
+        while producers:
+            item = await batches.get()
+            if item is None:
+                producers -= 1
+                continue
+            kind, rows, positions = item
+            new_post_ids, new_comment_ids = {}, {}
+            self._held, self._released = [], []
+            if kind == "posts":
+                rows, new_post_ids = self._assign_post_ids(rows)
+                await self._append("posts", rows)
+                # Comments that were waiting for these posts can go out now.
+                rows = (
+                    pd.concat(self._pending, ignore_index=True)
+                    if self._pending
+                    else None
+                )
+                self._released, self._pending = self._pending, []
+            if rows is not None and len(rows):
+                rows, new_comment_ids = self._resolve_comments(rows)
+                await self._append("comments", rows)
+            self._state.save(
+                positions,
+                {
+                    "post_id": self._next_ids["posts"],
+                    "comment_id": self._next_ids["comments"],
+                },
+                new_post_ids,
+                new_comment_ids,
+                self._held,
+                self._released,
+            )
+            self.stats["pending"] = sum(map(len, self._pending))
+
+    def _assign_post_ids(self, rows):
+        # Re-exported posts keep the id they were first given.
+        rows = rows.drop_duplicates(["platform", "native_id"])
+        keys = list(zip(rows["platform"], rows["native_id"]))
+        fresh = [key not in self._state.post_ids for key in keys]
+        rows = rows[fresh]
+        first = self._next_ids["posts"]
+        post_ids = range(first, first + len(rows))
+        new_post_ids = dict(zip(itertools.compress(keys, fresh), post_ids))
+        self._state.post_ids.update(new_post_ids)
+        self._next_ids["posts"] += len(rows)
+        return rows.assign(post_id=list(post_ids)), new_post_ids
+
+    def _resolve_comments(self, rows):
+        """Give comments whose post is known a comment_id and hold back the rest."""
+        # Re-exported comments keep the id they were first given.
+        rows = rows.drop_duplicates(["platform", "native_id"])
+        rows = rows[~self._state.known_comments(rows)]
+        post_ids = pd.Series(
+            [
+                self._state.post_ids.get(key)
+                for key in zip(rows["platform"], rows["native_post_id"])
+            ],
+            index=rows.index,
+            dtype="Int64",
+        )
+        waiting = rows[post_ids.isna()]
+        if len(waiting):
+            self._pending.append(waiting)
+            self._held.append(waiting)
+            held = sum(map(len, self._pending))
+            while held > MAX_PENDING_COMMENTS:
+                dropped = self._pending.pop(0)
+                self._held = [frame for frame in self._held if frame is not dropped]
+                self._released.append(dropped)
+                held -= len(dropped)
+                logger.warning(
+                    "dropped %d comments whose posts never arrived", len(dropped)
+                )
+        rows = rows[post_ids.notna()].assign(post_id=post_ids.dropna().astype(int))
+        first = self._next_ids["comments"]
+        comment_ids = range(first, first + len(rows))
+        self._next_ids["comments"] += len(rows)
+        new_comment_ids = dict(
+            zip(zip(rows["platform"], rows["native_id"]), comment_ids)
+        )
+        return rows.assign(comment_id=comment_ids), new_comment_ids
+
+    async def _append(self, kind, rows):
+        if not len(rows):
+            return
+        columns = KINDS[kind][1]
+        await asyncio.to_thread(_append_csv, rows[columns], self.csv_paths[kind])
+        self.stats[kind] += len(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Tail per-platform exports in the drop directory into the CSVs."
+    )
+    parser.add_argument("--drop-dir", default=FEED_DROP_DIR)
+    parser.add_argument(
+        "--once", action="store_true", help="drain the exports and exit"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    service = FeedService(args.drop_dir)
+    print(json.dumps(asyncio.run(service.run(follow=not args.once)), indent=2))
@@ -0,0 +1,259 @@
+import os
+import threading
+import uuid
+from collections import namedtuple
+
+import pandas as pd
+import pyarrow.compute as pc
+from pandas.api.types import union_categoricals
+
+from columnar import read_columnar, resolve_source
+from compaction import Compactor, footprint_report
+from keywords import build_matcher
+from polarity_cache import PolarityCache
+from sentiment import SCORER_VERSION, label_sentiment, score_polarity
+from settings import (
+    COMMENTS_CSV,
+    COMPACT_FRAMES,
+    DATA_FORMAT,
+    DEBUG_METRICS,
+    POSTS_CSV,
+)
+from tail import FileTail
+
+# ``reset`` means the frames were rebuilt from scratch rather than appended to.
+Delta = namedtuple("Delta", ["posts", "comments", "reset"])
+
+
+class Snapshot(
+    namedtuple("Snapshot", ["data_version", "posts", "comments", "aggregates"])
+):
+    """Consistent view of the loader's frames at one ``data_version``."""
+
+    __slots__ = ()
+
+    def aggregate(self, kind):
+        return next(agg for agg in self.aggregates if isinstance(agg, kind))
+
+
+def enrich_comments(comments, matcher=None, cache=None):
+    """Add sentiment scores, labels and keyword flags to raw comment rows."""
+    # Sentiment analysis
+    if cache is None:
+        with PolarityCache(SCORER_VERSION) as cache:
+            return enrich_comments(comments, matcher, cache)
+    comments["sentiment"] = score_polarity(comments["comment_text"], cache=cache)
+    comments["sentiment_label"] = label_sentiment(comments["sentiment"])
+
+    # Urgency and tech-topic flags, resolved in one pass over the text
+    matcher = matcher or build_matcher()
+    return comments.join(matcher.classify(comments["comment_text"]))
+
+
+def _append(frame, rows):
+    if frame is None or frame.empty:
+        return rows.reset_index(drop=True)
+    categoricals = {
+        column: union_categoricals([frame[column], rows[column]], ignore_order=True)
+        for column in frame.select_dtypes("category")
+        if isinstance(rows[column].dtype, pd.CategoricalDtype)
+    }
+    combined = pd.concat([frame, rows], ignore_index=True)
+    for column, values in categoricals.items():
+        combined[column] = values
+    return combined
+
+
+# Everything a ``_Source`` has read up to; only advanced once rows are kept.
+_Cursor = namedtuple(
+    "_Cursor", ["data_format", "path", "stamp", "position", "watermark"]
+)
+
+
+class _Source:
+    """Read position of one append-only posts or comments source.
+
+    CSVs are tailed from the last byte offset so only appended lines are
+    parsed. Columnar copies are re-read with an ``id > watermark`` filter,
+    which Parquet pushes down to skip row groups already seen. The format is
+    resolved on every read, so with ``auto`` a columnar copy is dropped for
+    its CSV as soon as the CSV is appended to.
+
+    ``read_new`` does not move the source forward; the caller hands the
+    returned cursor to ``advance`` once the rows are safely stored, so rows
+    from a refresh that failed part way are read again by the next one.
+    """
+
+    def __init__(self, csv_path, id_column, data_format):
+        self.csv_path = csv_path
+        self.requested_format = data_format
+        self.id_column = id_column
+        self._cursor = _Cursor(None, None, None, None, None)
+
+    @property
+    def watermark(self):
+        return self._cursor.watermark
+
+    def read_new(self):
+        """Return ``(rows, replaced, cursor)``; ``replaced`` means start over from ``rows``.
+
+        ``rows`` is ``None`` when the source has not changed since ``cursor``.
+        """
+        cursor = self._cursor
+        data_format, path = resolve_source(self.csv_path, self.requested_format)
+        if path != cursor.path:
+            # First read, or a switch between the CSV and its columnar copy.
+            # The watermark carries over, so only unseen ids come back.
+            cursor = _Cursor(data_format, path, None, None, cursor.watermark)
+        stat = os.stat(path)
+        stamp = (stat.st_size, stat.st_mtime_ns)
+        if stamp == cursor.stamp:
+            return None, False, cursor
+
+        watermark, position, replaced = cursor.watermark, None, False
+        if data_format == "csv":
+            tail = FileTail(path, header=True)
+            rows, position, replaced = next(tail.csv_blocks(cursor.position))
+            if replaced:
+                # Rewritten in place rather than appended to; reload it whole.
+                watermark = None
+        else:
+            filters = (
+                None if watermark is None else pc.field(self.id_column) > watermark
+            )
+            rows = read_columnar(path, filters=filters)
+
+        if watermark is not None:
+            rows = rows[rows[self.id_column] > watermark]
+        if not rows.empty:
+            newest = int(rows[self.id_column].max())
+            watermark = newest if watermark is None else max(watermark, newest)
+        return rows, replaced, _Cursor(data_format, path, stamp, position, watermark)
+
+    def advance(self, cursor):
+        self._cursor = cursor
+
+
+class IncrementalLoader:
+    """Posts and comments kept in memory and topped up from their sources.
+
+    ``refresh()`` reads only rows past the ``post_id``/``comment_id``
+    watermarks, scores just those comments and appends them, so the cost of
+    a refresh follows the size of the delta rather than the full history.
+    ``version`` increments whenever the frames change. With ``compact`` set,
+    each batch goes through a ``Compactor`` before it is appended.
+
+    Derived aggregates registered with ``add_aggregate`` get
+    ``apply(delta, loader)`` called under the same lock after each change.
+    """
+
+    def __init__(
+        self, data_format=DATA_FORMAT, compact=COMPACT_FRAMES, track=DEBUG_METRICS
+    ):
+        self._post_source = _Source(POSTS_CSV, "post_id", data_format)
+        self._comment_source = _Source(COMMENTS_CSV, "comment_id", data_format)
+        self._matcher = build_matcher()
+        self._compactors = (
+            {"posts": Compactor(track=track), "comments": Compactor(track=track)}
+            if compact
+            else None
+        )
+        self._track = track
+        self._lock = threading.Lock()
+        self.posts = None
+        self.comments = None
+        self.version = 0
+        self._token = uuid.uuid4().hex
+        # Polarity cache lookups made by the most recent refresh
+        self.cache_stats = {"hits": 0, "misses": 0}
+        self.rows_ingested = 0
+        self._aggregates = []
+
+    def add_aggregate(self, aggregate):
+        with self._lock:
+            self._aggregates.append(aggregate)
+            if self.posts is not None:
+                aggregate.apply(Delta(self.posts, self.comments, True), self)
+        return aggregate
+
+    def snapshot(self):
+        with self._lock:
+            return Snapshot(
+                self.data_version, self.posts, self.comments, tuple(self._aggregates)
+            )
+
+    @property
+    def data_version(self):
+        """Key that changes whenever the frames do, unique across loaders."""
+        return (self._token, self.version)
+
+    @property
+    def watermarks(self):
+        return {
+            "post_id": self._post_source.watermark,
+            "comment_id": self._comment_source.watermark,
+        }
+
+    def _compact(self, name, rows, replaced):
+        if self._compactors is None:
+            return rows
+        compactor = self._compactors[name]
+        if replaced:
+            compactor.reset()
+        return compactor.compact(rows)
+
+    def footprint_report(self):
+        """Bytes per column before and after compaction, or ``None`` if untracked."""
+        with self._lock:
+            if not (self._track and self._compactors) or self.posts is None:
+                return None
+            return footprint_report(
+                {"posts": self.posts, "comments": self.comments}, self._compactors
+            )
+
+    def refresh(self):
+        """Ingest rows appended since the last call and return them as a ``Delta``."""
+        with self._lock:
+            reset = self.posts is None
+            new_posts, posts_replaced, post_cursor = self._post_source.read_new()
+            if new_posts is not None:
+                new_posts = self._compact(
+                    "posts", new_posts, posts_replaced or self.posts is None
+                )
+
+            new_comments, comments_replaced, comment_cursor = (
+                self._comment_source.read_new()
+            )
+            cache_stats = {"hits": 0, "misses": 0}
+            if new_comments is not None:
+                with PolarityCache(SCORER_VERSION) as cache:
+                    new_comments = enrich_comments(new_comments, self._matcher, cache)
+                new_comments = self._compact(
+                    "comments", new_comments, comments_replaced or self.comments is None
+                )
+                cache_stats = {"hits": cache.hits, "misses": cache.misses}
+
+            # Both batches are ready; only now move the sources and frames on,
+            # so a failure above (e.g. a locked polarity cache) loses nothing.
+            self._post_source.advance(post_cursor)
+            self._comment_source.advance(comment_cursor)
+            self.cache_stats = cache_stats
+            reset |= posts_replaced or comments_replaced
+            if new_posts is None:
+                new_posts = self.posts.iloc[:0]
+            else:
+                self.posts = _append(None if posts_replaced else self.posts, new_posts)
+            if new_comments is None:
+                new_comments = self.comments.iloc[:0]
+            else:
+                self.comments = _append(
+                    None if comments_replaced else self.comments, new_comments
+                )
+
+            delta = Delta(new_posts, new_comments, reset)
+            self.rows_ingested = len(new_posts) + len(new_comments)
+            if reset or not (new_posts.empty and new_comments.empty):
+                self.version += 1
+                for aggregate in self._aggregates:
+                    aggregate.apply(delta, self)
+            return delta
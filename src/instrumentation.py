@@ -0,0 +1,129 @@
+import json
+import logging
+import os
+import time
+
+logger = logging.getLogger("social_media_analytics.metrics")
+
+
+def _enable_logging():
+    """Make the INFO stage lines visible when nothing else configured logging.
+
+    Streamlit only sets up its own ``streamlit.*`` loggers, and Python's
+    last-resort handler drops anything below WARNING.
+    """
+    logger.setLevel(logging.INFO)
+    if not logger.hasHandlers():
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+
+
+class Stage:
+    __slots__ = ("name", "seconds", "rows", "hits", "misses", "_start")
+
+    def __init__(self, name):
+        self.name = name
+        self.seconds = None
+        self.rows = None
+        self.hits = None
+        self.misses = None
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.seconds = time.perf_counter() - self._start
+
+    def as_dict(self):
+        return {
+            "stage": self.name,
+            "seconds": None if self.seconds is None else round(self.seconds, 6),
+            "rows": self.rows,
+            "cache_hits": self.hits,
+            "cache_misses": self.misses,
+        }
+
+
+class _NoopStage:
+    """Shared stand-in returned while profiling is off; attribute writes are dropped."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NOOP = _NoopStage()
+
+
+class Profiler:
+    """Per-rerun stage timings, row counts and cache hit/miss counts.
+
+    When disabled, ``stage()`` hands back one shared no-op context manager,
+    so instrumented code pays a method call and nothing else.
+    """
+
+    def __init__(self, enabled=False, metrics_file=None):
+        self.enabled = enabled
+        self.metrics_file = metrics_file
+        self.stages = []
+        if enabled:
+            _enable_logging()
+
+    def stage(self, name):
+        if not self.enabled:
+            return _NOOP
+        stage = Stage(name)
+        self.stages.append(stage)
+        return stage
+
+    def records(self):
+        return [stage.as_dict() for stage in self.stages]
+
+    def finish(self):
+        """Emit this rerun's stages as log lines and to the Prometheus text file."""
+        if not self.enabled:
+            return
+        for record in self.records():
+            logger.info(json.dumps({"event": "stage", **record}))
+        if self.metrics_file:
+            self._write_prometheus()
+
+    def _write_prometheus(self):
+        metrics = {
+            "sma_stage_seconds": (
+                "seconds",
+                "Duration of the stage in the last rerun.",
+            ),
+            "sma_stage_rows": (
+                "rows",
+                "Rows processed by the stage in the last rerun.",
+            ),
+            "sma_stage_cache_hits": ("cache_hits", "Cache hits during the stage."),
+            "sma_stage_cache_misses": (
+                "cache_misses",
+                "Cache misses during the stage.",
+            ),
+        }
+        records = self.records()
+        lines = []
+        for metric, (field, help_text) in metrics.items():
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} gauge"]
+            lines += [
+                f'{metric}{{stage="{record["stage"]}"}} {record[field]}'
+                for record in records
+                if record[field] is not None
+            ]
+        # Write-then-rename so scrapers never see a half-written file.
+        tmp_path = f"{self.metrics_file}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, self.metrics_file)
@@ -0,0 +1,94 @@
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from settings import TECH_TOPICS, URGENT_TERMS
+
+# =====================================
+# Keyword Classification
+# =====================================
+URGENT_COLUMN = "is_urgent"
+
+
+def topic_column(topic):
+    return f"topic_{topic.lower()}"
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton mapping each text to a bitmask of matched groups.
+
+    ``groups`` maps a column name to the terms that set its bit. Terms match
+    case-insensitively anywhere in the text, like ``str.contains(case=False)``,
+    but every group is resolved in a single pass over the characters.
+    """
+
+    def __init__(self, groups):
+        self.columns = list(groups)
+        self._goto = [{}]
+        self._output = [0]
+        for bit, terms in enumerate(groups.values()):
+            for term in terms:
+                self._insert(term.lower(), 1 << bit)
+        self._fail = self._link()
+
+    def _insert(self, term, mask):
+        state = 0
+        for char in term:
+            nxt = self._goto[state].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][char] = nxt
+                self._goto.append({})
+                self._output.append(0)
+            state = nxt
+        self._output[state] |= mask
+
+    def _link(self):
+        fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                back = fail[state]
+                while back and char not in self._goto[back]:
+                    back = fail[back]
+                fail[nxt] = self._goto[back].get(char, 0)
+                if fail[nxt] == nxt:
+                    fail[nxt] = 0
+                # Inherit matches that end at the fallback state.
+                self._output[nxt] |= self._output[fail[nxt]]
+        return fail
+
+    def mask(self, text):
+        goto, fail, output = self._goto, self._fail, self._output
+        state = found = 0
+        for char in text.lower():
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            found |= output[state]
+        return found
+
+    def classify(self, texts):
+        """Return one boolean column per group, scanning each distinct text once."""
+        codes, uniques = pd.factorize(texts.fillna(""))
+        masks = np.fromiter(map(self.mask, uniques), dtype="int64", count=len(uniques))
+        row_masks = masks[codes]
+        return pd.DataFrame(
+            {
+                column: (row_masks >> bit) & 1 == 1
+                for bit, column in enumerate(self.columns)
+            },
+            index=texts.index,
+        )
+
+
+def build_matcher(topics=TECH_TOPICS, urgent_terms=URGENT_TERMS):
+    return KeywordMatcher(
+        {
+            URGENT_COLUMN: urgent_terms,
+            **{topic_column(topic): terms for topic, terms in topics.items()},
+        }
+    )
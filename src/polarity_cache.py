@@ -0,0 +1,125 @@
+import hashlib
+import sqlite3
+import time
+
+from settings import SENTIMENT_CACHE_MAX_ENTRIES, SENTIMENT_CACHE_PATH
+
+# SQLite caps the number of bound parameters per statement.
+_BATCH = 900
+# Hits only refresh ``last_used`` once it is this many seconds old, so
+# repeated lookups of the same texts don't rewrite the table every refresh.
+_TOUCH_SECONDS = 3600
+
+
+class PolarityCache:
+    """Persistent polarity cache keyed by a hash of (scorer version, text).
+
+    Entries live in a local SQLite file so restarts and code edits only score
+    comments that have never been seen. The table is bounded to
+    ``max_entries`` rows; the least recently used rows are evicted first.
+    Recency is tracked to within ``_TOUCH_SECONDS``. The file is shared with
+    the feed service, so writers wait on each other's locks rather than fail.
+    """
+
+    def __init__(
+        self,
+        version,
+        path=SENTIMENT_CACHE_PATH,
+        max_entries=SENTIMENT_CACHE_MAX_ENTRIES,
+    ):
+        self.version = version
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._conn = sqlite3.connect(path, timeout=60)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS polarity (
+                key BLOB PRIMARY KEY,
+                score REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+            """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS polarity_last_used ON polarity (last_used)"
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _key(self, text):
+        return hashlib.sha1(f"{self.version}\0{text}".encode("utf-8")).digest()
+
+    def get_many(self, texts):
+        """Return ``{text: score}`` for every text already in the cache."""
+        keyed = {self._key(text): text for text in texts}
+        keys = list(keyed)
+        found = {}
+        stale = []
+        now = time.time()
+        for start in range(0, len(keys), _BATCH):
+            batch = keys[start : start + _BATCH]
+            rows = self._conn.execute(
+                f"SELECT key, score, last_used FROM polarity WHERE key IN ({','.join('?' * len(batch))})",
+                batch,
+            ).fetchall()
+            for key, score, last_used in rows:
+                found[keyed[key]] = score
+                if last_used < now - _TOUCH_SECONDS:
+                    stale.append(key)
+
+        if stale:
+            self._conn.executemany(
+                "UPDATE polarity SET last_used = ? WHERE key = ?",
+                ((now, key) for key in stale),
+            )
+            self._conn.commit()
+
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, scores):
+        """Store ``{text: score}`` and evict down to ``max_entries``."""
+        if not scores:
+            return
+        now = time.time()
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO polarity (key, score, last_used) VALUES (?, ?, ?)",
+            ((self._key(text), float(score), now) for text, score in scores.items()),
+        )
+        self._evict()
+        self._conn.commit()
+
+    def _evict(self):
+        (size,) = self._conn.execute("SELECT COUNT(*) FROM polarity").fetchone()
+        overflow = size - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                """
+                DELETE FROM polarity WHERE key IN (
+                    SELECT key FROM polarity ORDER BY last_used LIMIT ?
+                )
+                """,
+                (overflow,),
+            )
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM polarity").fetchone()[0]
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        self._conn.close()
@@ -0,0 +1,98 @@
+import numpy as np
+
+
+class SearchCache:
+    """Bounded memo of post text searches, keyed by the normalized query.
+
+    ``match(query)`` receives the stripped, lower-cased query and returns the
+    matching post_ids; the owner calls ``clear()`` whenever the posts change.
+    """
+
+    def __init__(self, match, size=64):
+        self._match = match
+        self._size = size
+        self._results = {}
+
+    def get(self, query=""):
+        query = query.strip().lower()
+        if query not in self._results:
+            if len(self._results) >= self._size:
+                self._results.clear()
+            self._results[query] = self._match(query)
+        return self._results[query]
+
+    def clear(self):
+        self._results.clear()
+
+
+class PostIndex:
+    """``post_id``-keyed lookups for posts and their comments.
+
+    Maps each post_id to its row in the posts frame and to the rows of its
+    comments, so the Post Details tab resolves a selection in O(1) instead of
+    scanning both frames. Registered on ``IncrementalLoader``; appended
+    comments are merged into the per-post row lists of only the posts they
+    touch.
+    """
+
+    def __init__(self):
+        self.posts = None
+        self.comments = None
+        self._post_rows = {}
+        self._comment_rows = {}
+        self._search_text = None
+        self._searches = SearchCache(self._match)
+
+    def apply(self, delta, loader):
+        if delta.reset or self.posts is None:
+            self._post_rows = {}
+            self._comment_rows = {}
+            self._index_posts(loader.posts["post_id"], 0)
+            self._index_comments(loader.comments["post_id"], 0)
+        else:
+            self._index_posts(
+                delta.posts["post_id"], len(loader.posts) - len(delta.posts)
+            )
+            self._index_comments(
+                delta.comments["post_id"], len(loader.comments) - len(delta.comments)
+            )
+        self.posts = loader.posts
+        self.comments = loader.comments
+        self._search_text = None
+        self._searches.clear()
+
+    def _index_posts(self, post_ids, offset):
+        self._post_rows.update(
+            zip(post_ids.tolist(), range(offset, offset + len(post_ids)))
+        )
+
+    def _index_comments(self, post_ids, offset):
+        # groupby().indices gives positional row arrays per post_id
+        for post_id, rows in post_ids.groupby(post_ids.values).indices.items():
+            rows = rows + offset
+            known = self._comment_rows.get(post_id)
+            self._comment_rows[post_id] = (
+                rows if known is None else np.concatenate([known, rows])
+            )
+
+    def post(self, post_id):
+        return self.posts.iloc[self._post_rows[post_id]]
+
+    def comments_for(self, post_id):
+        return self.comments.iloc[self._comment_rows.get(post_id, [])]
+
+    def label(self, post_id):
+        post = self.post(post_id)
+        return f"#{post_id} · {post['platform']} · {post['post_text']}"
+
+    def search(self, query=""):
+        """Return the post_ids whose text contains ``query`` (case-insensitive)."""
+        return self._searches.get(query)
+
+    def _match(self, query):
+        post_ids = self.posts["post_id"]
+        if query:
+            if self._search_text is None:
+                self._search_text = self.posts["post_text"].astype(str).str.lower()
+            post_ids = post_ids[self._search_text.str.contains(query, regex=False)]
+        return post_ids.to_numpy()
@@ -0,0 +1,84 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import textblob
+from textblob import TextBlob
+
+from settings import (
+    SENTIMENT_CHUNK_SIZE,
+    SENTIMENT_PARALLEL_MIN_TEXTS,
+    SENTIMENT_WORKERS,
+)
+
+# =====================================
+# Sentiment Scoring
+# =====================================
+POSITIVE_THRESHOLD = 0.2
+NEGATIVE_THRESHOLD = -0.2
+
+# Bump the suffix whenever polarity() changes so cached scores are not reused.
+SCORER_VERSION = f"textblob-{textblob.__version__}/1"
+
+
+def polarity(text):
+    return TextBlob(text).sentiment.polarity
+
+
+def _score_chunk(chunk):
+    return [polarity(text) for text in chunk]
+
+
+def score_texts(texts, workers=None):
+    """Score ``texts`` in order, fanning chunks out over a process pool.
+
+    TextBlob is pure Python, so threads would serialize on the GIL. Small
+    inputs are scored inline since spinning up workers would dominate.
+    Workers come from a forkserver: this runs on Streamlit's script thread,
+    and forking a process with other live threads can deadlock the child.
+    """
+    texts = list(texts)
+    workers = workers or SENTIMENT_WORKERS or os.cpu_count() or 1
+    if workers <= 1 or len(texts) < SENTIMENT_PARALLEL_MIN_TEXTS:
+        return _score_chunk(texts)
+
+    chunk_size = max(1, min(SENTIMENT_CHUNK_SIZE, -(-len(texts) // workers)))
+    chunks = [texts[i : i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(chunks)),
+        mp_context=multiprocessing.get_context("forkserver"),
+    ) as pool:
+        # map() yields results in submission order, keeping scores aligned.
+        return [score for scores in pool.map(_score_chunk, chunks) for score in scores]
+
+
+def score_polarity(texts, cache=None, workers=None):
+    """Score every distinct text once and broadcast the result back to each row.
+
+    Comments are mostly rendered from a few hundred templates, so scoring the
+    unique values and joining on the factorized codes skips the repeated work.
+    When a ``PolarityCache`` is given, only texts it has never seen are scored.
+    """
+    codes, uniques = pd.factorize(texts.fillna(""))
+    known = cache.get_many(uniques) if cache is not None else {}
+    missing = [text for text in uniques if text not in known]
+    fresh = dict(zip(missing, score_texts(missing, workers=workers)))
+    if cache is not None:
+        cache.put_many(fresh)
+
+    lookup = {**known, **fresh}
+    scores = np.fromiter(
+        (lookup[text] for text in uniques), dtype="float64", count=len(uniques)
+    )
+    return pd.Series(scores[codes], index=texts.index, name="sentiment")
+
+
+def label_sentiment(scores):
+    labels = np.select(
+        [scores > POSITIVE_THRESHOLD, scores < NEGATIVE_THRESHOLD],
+        ["Positive", "Negative"],
+        default="Neutral",
+    )
+    return pd.Series(labels, index=scores.index, name="sentiment_label", dtype=object)
@@ -0,0 +1,88 @@
+import json
+import os
+
+from dotenv import load_dotenv
+
+# =====================================
+# Runtime Settings (overridable via .env)
+# =====================================
+load_dotenv()
+
+SENTIMENT_CACHE_PATH = os.getenv("SENTIMENT_CACHE_PATH", ".sentiment_cache.sqlite")
+SENTIMENT_CACHE_MAX_ENTRIES = int(os.getenv("SENTIMENT_CACHE_MAX_ENTRIES", "1000000"))
+
+# 0 means one worker per CPU core.
+SENTIMENT_WORKERS = int(os.getenv("SENTIMENT_WORKERS", "0"))
+SENTIMENT_CHUNK_SIZE = int(os.getenv("SENTIMENT_CHUNK_SIZE", "2000"))
+# Below this many texts to score, process startup costs more than it saves.
+SENTIMENT_PARALLEL_MIN_TEXTS = int(os.getenv("SENTIMENT_PARALLEL_MIN_TEXTS", "5000"))
+
+# Keyword topics for the Tech Insights tab; matched case-insensitively as
+# substrings. Override with a JSON object, e.g. {"AI": ["ai", "llm"]}.
+TECH_TOPICS = json.loads(
+    os.getenv(
+        "TECH_TOPICS",
+        json.dumps(
+            {
+                "AI": ["AI", "artificial intelligence"],
+                "Cloud": ["cloud", "AWS", "Azure"],
+                "Security": ["security", "cyber", "CVE"],
+                "API": ["API", "integration"],
+            }
+        ),
+    )
+)
+URGENT_TERMS = json.loads(os.getenv("URGENT_TERMS", '["urgent", "critical", "outage"]'))
+
+POSTS_CSV = os.getenv("POSTS_CSV", "mock_posts_biz.csv")
+COMMENTS_CSV = os.getenv("COMMENTS_CSV", "mock_comments_biz.csv")
+# csv, parquet, arrow, or auto (columnar copy when it is at least as new as the CSV)
+DATA_FORMAT = os.getenv("DATA_FORMAT", "auto")
+
+POST_PAGE_SIZE = int(os.getenv("POST_PAGE_SIZE", "50"))
+
+# Point budget per series for the Engagement Over Time chart
+ENGAGEMENT_MAX_POINTS = int(os.getenv("ENGAGEMENT_MAX_POINTS", "1000"))
+
+# Per-stage timings: shown in a debug expander and logged when enabled
+DEBUG_METRICS = os.getenv("DEBUG_METRICS", "0") == "1"
+# Optional Prometheus text-format file rewritten after every rerun
+METRICS_FILE = os.getenv("METRICS_FILE") or None
+
+# memory keeps frames in the app process; sqlite ingests into an indexed
+# database file that several app instances can share
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "memory")
+SQL_DB_PATH = os.getenv("SQL_DB_PATH", "analytics.sqlite")
+# Rows parsed, scored and committed per ingestion transaction
+SQL_INGEST_BATCH_ROWS = int(os.getenv("SQL_INGEST_BATCH_ROWS", "100000"))
+
+# Critical alerts shown per window; windows are pandas offsets measured back
+# from the newest comment
+ALERT_TOP_K = int(os.getenv("ALERT_TOP_K", "3"))
+ALERT_WINDOWS = json.loads(
+    os.getenv(
+        "ALERT_WINDOWS", '{"Last hour": "1h", "Last day": "1D", "Last week": "7D"}'
+    )
+)
+
+# Shrink loaded frames: categoricals for repetitive text, narrow numerics
+COMPACT_FRAMES = os.getenv("COMPACT_FRAMES", "1") == "1"
+# Object columns with at most this share of distinct values become categoricals
+COMPACT_CATEGORY_RATIO = float(os.getenv("COMPACT_CATEGORY_RATIO", "0.5"))
+
+# Feed service: per-platform JSONL exports dropped here are tailed into the
+# post/comment CSVs
+FEED_DROP_DIR = os.getenv("FEED_DROP_DIR", "drop")
+FEED_STATE_PATH = os.getenv("FEED_STATE_PATH", ".feeds_state.sqlite")
+# Rows per micro-batch handed to scoring and written out
+FEED_BATCH_SIZE = int(os.getenv("FEED_BATCH_SIZE", "1000"))
+# Chunks buffered per queue before readers wait for the writer
+FEED_QUEUE_SIZE = int(os.getenv("FEED_QUEUE_SIZE", "8"))
+FEED_POLL_SECONDS = float(os.getenv("FEED_POLL_SECONDS", "1.0"))
+
+# Near-duplicate complaint clustering (MinHash + LSH over negative comments)
+CLUSTER_NUM_PERM = int(os.getenv("CLUSTER_NUM_PERM", "64"))
+CLUSTER_BANDS = int(os.getenv("CLUSTER_BANDS", "16"))
+# Estimated Jaccard similarity needed to merge two texts that share a band
+CLUSTER_THRESHOLD = float(os.getenv("CLUSTER_THRESHOLD", "0.5"))
+CLUSTER_TOP_N = int(os.getenv("CLUSTER_TOP_N", "10"))
@@ -0,0 +1,534 @@
+import argparse
+import json
+import os
+import sqlite3
+import threading
+from collections import namedtuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from alerts import ALERT_COLUMNS, ALL_TIME, WINDOWS
+from clusters import ComplaintClusters
+from columnar import EXTENSIONS, resolve_source
+from ingest import enrich_comments
+from keywords import URGENT_COLUMN, build_matcher, topic_column
+from polarity_cache import PolarityCache
+from post_index import SearchCache
+from sentiment import SCORER_VERSION
+from settings import (
+    ALERT_TOP_K,
+    CLUSTER_TOP_N,
+    COMMENTS_CSV,
+    DATA_FORMAT,
+    POSTS_CSV,
+    SQL_DB_PATH,
+    SQL_INGEST_BATCH_ROWS,
+    TECH_TOPICS,
+)
+from tail import FileTail
+from timeseries import WindowedSeries
+
+# =====================================
+# Embedded SQL Storage
+# =====================================
+POST_COLUMNS = [
+    "post_id",
+    "platform",
+    "post_text",
+    "post_type",
+    "likes",
+    "shares",
+    "comments",
+    "date",
+]
+COMMENT_COLUMNS = [
+    "comment_id",
+    "post_id",
+    "platform",
+    "comment_text",
+    "user",
+    "likes",
+    "date",
+    "sentiment",
+    "sentiment_label",
+]
+FLAG_COLUMNS = [URGENT_COLUMN] + [topic_column(topic) for topic in TECH_TOPICS]
+
+
+def _quote(name):
+    # Flag columns come from the configurable topic names, so every
+    # identifier is quoted rather than trusted to be a bare word.
+    return '"' + name.replace('"', '""') + '"'
+
+
+_URGENT = _quote(URGENT_COLUMN)
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS posts (
+    post_id INTEGER PRIMARY KEY,
+    platform TEXT,
+    post_text TEXT,
+    post_type TEXT,
+    likes INTEGER,
+    shares INTEGER,
+    comments INTEGER,
+    date TEXT
+);
+CREATE TABLE IF NOT EXISTS comments (
+    comment_id INTEGER PRIMARY KEY,
+    post_id INTEGER,
+    platform TEXT,
+    comment_text TEXT,
+    user TEXT,
+    likes INTEGER,
+    date TEXT,
+    sentiment REAL,
+    sentiment_label TEXT,
+    {", ".join(f"{_quote(column)} INTEGER" for column in FLAG_COLUMNS)}
+);
+CREATE INDEX IF NOT EXISTS posts_date ON posts (date);
+CREATE INDEX IF NOT EXISTS posts_platform ON posts (platform);
+CREATE INDEX IF NOT EXISTS comments_post_id ON comments (post_id);
+CREATE INDEX IF NOT EXISTS comments_date ON comments (date);
+CREATE INDEX IF NOT EXISTS comments_platform_label
+    ON comments (platform, sentiment_label);
+CREATE INDEX IF NOT EXISTS comments_critical
+    ON comments (sentiment_label, {_URGENT}, likes DESC);
+"""
+
+# Stored rows depend on the scorer, the keyword columns and the layout of
+# the tables and read positions; a change to any rebuilds the database from
+# the sources.
+_LAYOUT = 3
+_SCHEMA_KEY = json.dumps([SCORER_VERSION, FLAG_COLUMNS, _LAYOUT])
+
+
+class SqlSnapshot(namedtuple("SqlSnapshot", ["data_version", "store"])):
+    """``Snapshot`` counterpart whose aggregates all resolve to the SQL store."""
+
+    __slots__ = ()
+
+    def aggregate(self, kind):
+        return self.store
+
+
+class _SqlSource:
+    """Append-only posts or comments source read in bounded blocks.
+
+    The read position (CSV ``TailPosition`` or columnar id watermark) is kept in
+    the ``meta`` table and committed with the rows it covers, so any process
+    sharing the database resumes from the same place.
+    """
+
+    def __init__(self, csv_path, table, id_column, data_format):
+        self.csv_path = csv_path
+        self.requested_format = data_format
+        self.table = table
+        self.id_column = id_column
+        self.resolve()
+
+    def resolve(self):
+        """Pick the file to read now; returns the meta key of its read position."""
+        self.data_format, self.path = resolve_source(
+            self.csv_path, self.requested_format
+        )
+        # CSV positions and columnar watermarks are kept apart; switching
+        # between them re-reads from that format's own position, and rows
+        # already stored are skipped by primary key.
+        return f"{self.table}.position.{self.data_format}"
+
+    def blocks(self, position, batch_rows):
+        """Yield ``(rows, position, reset)`` blocks for data past ``position``.
+
+        ``reset`` means the source was rewritten rather than appended to, so
+        the table is emptied before ``rows`` (which may be ``None``) go in.
+        """
+        if self.data_format == "csv":
+            yield from self._csv_blocks(position, batch_rows)
+        else:
+            yield from self._columnar_blocks(position, batch_rows)
+
+    def _csv_blocks(self, position, batch_rows):
+        tail = FileTail(self.path, header=True)
+        for rows, position, reset in tail.csv_blocks(position, batch_rows):
+            if len(rows) or reset:
+                yield (rows if len(rows) else None), position, reset
+
+    def _columnar_blocks(self, watermark, batch_rows):
+        fmt = "parquet" if self.path.endswith(EXTENSIONS["parquet"]) else "ipc"
+        dataset = ds.dataset(self.path, format=fmt)
+        filters = None if watermark is None else pc.field(self.id_column) > watermark
+        for batch in dataset.to_batches(filter=filters, batch_size=batch_rows):
+            if batch.num_rows:
+                rows = pa.Table.from_batches([batch]).to_pandas(date_as_object=False)
+                watermark = max(watermark or 0, int(rows[self.id_column].max()))
+                yield rows, watermark, False
+
+
+class SqlStore(WindowedSeries):
+    """Posts and comments ingested into an indexed SQLite file.
+
+    Drop-in for ``IncrementalLoader`` plus its aggregates: ``refresh()``
+    ingests appended rows block by block (scoring comments on the way in)
+    and every dashboard query runs as SQL against the indexes, so app memory
+    stays flat as history grows. Any number of app processes can point at
+    the same file; WAL mode lets them read while one of them ingests.
+    """
+
+    def __init__(
+        self,
+        data_format=DATA_FORMAT,
+        path=SQL_DB_PATH,
+        batch_rows=SQL_INGEST_BATCH_ROWS,
+    ):
+        super().__init__()
+        self.path = path
+        self.batch_rows = batch_rows
+        self._sources = [
+            _SqlSource(POSTS_CSV, "posts", "post_id", data_format),
+            _SqlSource(COMMENTS_CSV, "comments", "comment_id", data_format),
+        ]
+        self._matcher = build_matcher()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._seen_version = None
+        self._searches = SearchCache(self._match)
+        self._clusters = None
+        self._clusters_lock = threading.Lock()
+        # Polarity cache lookups and rows written by the most recent refresh
+        self.cache_stats = {"hits": 0, "misses": 0}
+        self.rows_ingested = 0
+        self._create_schema()
+
+    # ------------------
+    # Connection & metadata
+    # ------------------
+    @property
+    def _conn(self):
+        # sqlite3 connections must not be shared between threads.
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _create_schema(self):
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+            )
+            if self._meta("schema") not in (None, _SCHEMA_KEY):
+                conn.execute("DROP TABLE IF EXISTS posts")
+                conn.execute("DROP TABLE IF EXISTS comments")
+                conn.execute("DELETE FROM meta WHERE key != 'version'")
+            for statement in _SCHEMA.split(";"):
+                if statement.strip():
+                    conn.execute(statement)
+            self._set_meta("schema", _SCHEMA_KEY)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _meta(self, key):
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,))
+        row = row.fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def _set_meta(self, key, value):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+            (key, json.dumps(value)),
+        )
+
+    @property
+    def version(self):
+        return self._meta("version") or 0
+
+    @property
+    def data_version(self):
+        return ("sqlite", os.path.abspath(self.path), self.version)
+
+    @property
+    def watermarks(self):
+        return {
+            "post_id": self._conn.execute("SELECT MAX(post_id) FROM posts").fetchone()[
+                0
+            ],
+            "comment_id": self._conn.execute(
+                "SELECT MAX(comment_id) FROM comments"
+            ).fetchone()[0],
+        }
+
+    # ------------------
+    # Ingestion
+    # ------------------
+    def refresh(self):
+        """Ingest rows appended since the last call; returns the rows written."""
+        with self._lock, PolarityCache(SCORER_VERSION) as cache:
+            self.rows_ingested = 0
+            for source in self._sources:
+                self.rows_ingested += self._ingest(source, cache)
+            self.cache_stats = {"hits": cache.hits, "misses": cache.misses}
+            return self.rows_ingested
+
+    def _ingest(self, source, cache):
+        conn = self._conn
+        key = source.resolve()
+        written = 0
+        for rows, position, reset in source.blocks(self._meta(key), self.batch_rows):
+            if rows is not None and source.table == "comments":
+                rows = enrich_comments(rows, self._matcher, cache)
+            # One transaction per block: the rows and the read position that
+            # covers them land together.
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if reset:
+                    conn.execute(f"DELETE FROM {source.table}")
+                    resets = f"{source.table}.resets"
+                    self._set_meta(resets, (self._meta(resets) or 0) + 1)
+                before = conn.total_changes
+                if rows is not None:
+                    self._insert(source.table, rows)
+                inserted = conn.total_changes - before
+                self._set_meta(key, position)
+                if reset or inserted:
+                    self._set_meta("version", self.version + 1)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            written += inserted
+        return written
+
+    def _insert(self, table, rows):
+        columns = POST_COLUMNS if table == "posts" else COMMENT_COLUMNS + FLAG_COLUMNS
+        rows = rows[columns].assign(date=rows["date"].dt.strftime("%Y-%m-%d %H:%M:%S"))
+        names = ", ".join(map(_quote, columns))
+        # Rows another process already wrote are skipped by primary key.
+        self._conn.executemany(
+            f"INSERT OR IGNORE INTO {table} ({names}) "
+            f"VALUES ({', '.join('?' * len(columns))})",
+            rows.astype(object).itertuples(index=False, name=None),
+        )
+
+    def snapshot(self):
+        version = self.data_version
+        if version != self._seen_version:
+            # Another process (or this one) ingested since the last rerun.
+            self._cache.clear()
+            self._searches.clear()
+            self._seen_version = version
+        return SqlSnapshot(version, self)
+
+    def footprint_report(self):
+        # Rows live in the database file, not in app memory.
+        return None
+
+    def _query(self, sql, params=()):
+        return pd.read_sql_query(sql, self._conn, params=params, parse_dates=["date"])
+
+    # ------------------
+    # Queries
+    # ------------------
+    def summary(self):
+        total_posts, engagement = self._conn.execute(
+            "SELECT COUNT(*), SUM(likes + shares + comments) FROM posts"
+        ).fetchone()
+        by_label = self.sentiment_counts()
+        total_comments = int(by_label.sum())
+        (urgent,) = self._conn.execute(
+            f"SELECT COUNT(*) FROM comments "
+            f"WHERE sentiment_label = 'Negative' AND {_URGENT} = 1"
+        ).fetchone()
+        return {
+            "total_posts": total_posts,
+            "urgent_issues": urgent,
+            # Default to 0% if no comments are available
+            "positive_percentage": (
+                int(by_label.get("Positive", 0) / total_comments * 100)
+                if total_comments
+                else 0
+            ),
+            "avg_engagement": (
+                round(engagement / (3 * total_posts)) if total_posts else 0
+            ),
+        }
+
+    def sentiment_counts(self):
+        counts = pd.read_sql_query(
+            "SELECT sentiment_label, COUNT(*) AS comment_count "
+            "FROM comments GROUP BY sentiment_label",
+            self._conn,
+        )
+        return counts.set_index("sentiment_label")["comment_count"]
+
+    def sentiment_by_platform(self):
+        counts = pd.read_sql_query(
+            "SELECT platform, sentiment_label, COUNT(*) AS comment_count "
+            "FROM comments GROUP BY platform, sentiment_label",
+            self._conn,
+        )
+        return counts.pivot(
+            index="platform", columns="sentiment_label", values="comment_count"
+        )
+
+    def topic_counts(self, sentiment_label=None):
+        sums = ", ".join(
+            f"COALESCE(SUM({_quote(topic_column(topic))}), 0)" for topic in TECH_TOPICS
+        )
+        sql, params = f"SELECT {sums} FROM comments", ()
+        if sentiment_label is not None:
+            sql, params = sql + " WHERE sentiment_label = ?", (sentiment_label,)
+        return dict(zip(TECH_TOPICS, self._conn.execute(sql, params).fetchone()))
+
+    @property
+    def date_range(self):
+        first, last = self._conn.execute(
+            "SELECT MIN(date), MAX(date) FROM posts"
+        ).fetchone()
+        if first is None:
+            return None
+        return pd.Timestamp(first), pd.Timestamp(last)
+
+    def _window(self, granularity, start, end):
+        bounds = (f"{start:%Y-%m-%d}", f"{end:%Y-%m-%d}")
+        if granularity == "post":
+            return self._query(
+                "SELECT date, likes, shares, comments FROM posts "
+                "WHERE date >= ? AND date < ? ORDER BY date",
+                bounds,
+            )
+        # Daily sums are computed in the database; weekly resamples them.
+        return self._query(
+            "SELECT date(date) AS date, SUM(likes) AS likes, SUM(shares) AS shares, "
+            "SUM(comments) AS comments FROM posts "
+            "WHERE date >= ? AND date < ? GROUP BY 1 ORDER BY 1",
+            bounds,
+        )
+
+    def search(self, query=""):
+        """Return the post_ids whose text contains ``query`` (case-insensitive)."""
+        return self._searches.get(query)
+
+    def _match(self, query):
+        return pd.read_sql_query(
+            "SELECT post_id FROM posts WHERE instr(lower(post_text), ?) > 0 "
+            "ORDER BY post_id",
+            self._conn,
+            params=(query,),
+        )["post_id"].to_numpy()
+
+    def post(self, post_id):
+        return self._query(
+            "SELECT * FROM posts WHERE post_id = ?", (int(post_id),)
+        ).iloc[0]
+
+    def comments_for(self, post_id):
+        return self._query(
+            "SELECT * FROM comments WHERE post_id = ? ORDER BY comment_id",
+            (int(post_id),),
+        )
+
+    def label(self, post_id):
+        platform, text = self._conn.execute(
+            "SELECT platform, post_text FROM posts WHERE post_id = ?", (int(post_id),)
+        ).fetchone()
+        return f"#{post_id} · {platform} · {text}"
+
+    def _alert_cutoffs(self):
+        # Same windows as ``CriticalAlerts``: the hour buckets after the one
+        # ``span`` back from the newest comment's hour. Dates are stored as
+        # text, so cutoffs compare as text too.
+        (newest,) = self._conn.execute("SELECT MAX(date) FROM comments").fetchone()
+        if newest is None:
+            # No comments yet: NULL cutoffs match nothing, so counts stay 0.
+            return dict.fromkeys(WINDOWS)
+        newest = pd.Timestamp(newest).floor("h")
+        hour = pd.Timedelta(hours=1)
+        return {
+            name: f"{newest - span + hour:%Y-%m-%d %H:%M:%S}"
+            for name, span in WINDOWS.items()
+        }
+
+    def alerts(self, window=ALL_TIME):
+        """Most-liked urgent negative comments, read off the covering index."""
+        sql = (
+            f"SELECT {', '.join(ALERT_COLUMNS)} FROM comments "
+            f"WHERE sentiment_label = 'Negative' AND {_URGENT} = 1"
+        )
+        params = ()
+        if window != ALL_TIME:
+            sql, params = sql + " AND date >= ?", (self._alert_cutoffs()[window],)
+        return self._query(
+            sql + " ORDER BY likes DESC, comment_id LIMIT ?", params + (ALERT_TOP_K,)
+        )
+
+    def alert_counts(self):
+        cutoffs = self._alert_cutoffs()
+        windows = "".join(", COALESCE(SUM(date >= ?), 0)" for _ in cutoffs)
+        counts = self._conn.execute(
+            f"SELECT COUNT(*){windows} FROM comments "
+            f"WHERE sentiment_label = 'Negative' AND {_URGENT} = 1",
+            tuple(cutoffs.values()),
+        ).fetchone()
+        return dict(zip([ALL_TIME, *cutoffs], counts))
+
+    def complaint_clusters(self, limit=CLUSTER_TOP_N):
+        """Clusters of near-duplicate negative comments, folded forward by comment_id."""
+        with self._clusters_lock:
+            generation = self._meta("comments.resets") or 0
+            if self._clusters is None or self._clusters[0] != generation:
+                self._clusters = (generation, 0, ComplaintClusters())
+            _, clustered_through, clusters = self._clusters
+            (newest,) = self._conn.execute(
+                "SELECT MAX(comment_id) FROM comments"
+            ).fetchone()
+            if newest is not None and newest > clustered_through:
+                # Grouped by text in the database; only distinct texts come back.
+                text_stats = pd.read_sql_query(
+                    "SELECT comment_text, COUNT(*) AS comments, SUM(likes) AS likes, "
+                    "MIN(date) AS first_seen, MAX(date) AS last_seen FROM comments "
+                    "WHERE sentiment_label = 'Negative' "
+                    "AND comment_id > ? AND comment_id <= ? GROUP BY comment_text",
+                    self._conn,
+                    params=(clustered_through, newest),
+                    parse_dates=["first_seen", "last_seen"],
+                )
+                if not text_stats.empty:
+                    clusters.add(text_stats.set_index("comment_text"))
+                self._clusters = (generation, newest, clusters)
+            return clusters.complaint_clusters(limit)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Ingest the post and comment sources into the SQL database."
+    )
+    parser.add_argument(
+        "--format", choices=["auto", "csv", "parquet", "arrow"], default=DATA_FORMAT
+    )
+    parser.add_argument("--db", default=SQL_DB_PATH)
+    args = parser.parse_args()
+
+    store = SqlStore(args.format, args.db)
+    written = store.refresh()
+    print(
+        json.dumps(
+            {
+                "rows_ingested": written,
+                "watermarks": store.watermarks,
+                "version": store.version,
+                **store.cache_stats,
+            },
+            indent=2,
+        )
+    )
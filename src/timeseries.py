@@ -0,0 +1,138 @@
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from cube import ENGAGEMENT
+
+# =====================================
+# Engagement Time Series
+# =====================================
+RESAMPLE_RULES = {"day": "D", "week": "W-MON"}
+
+
+def lttb(x, y, max_points):
+    """Largest-Triangle-Three-Buckets: indices of ``max_points`` shape-preserving points.
+
+    Keeps the first and last points and, per bucket, the point forming the
+    largest triangle with the previously kept point and the next bucket's mean.
+    """
+    n = len(x)
+    if max_points >= n or max_points < 3:
+        return np.arange(n)
+
+    every = (n - 2) / (max_points - 2)
+    keep = np.empty(max_points, dtype="int64")
+    keep[0], keep[-1] = 0, n - 1
+    anchor = 0
+    for bucket in range(max_points - 2):
+        start = int(bucket * every) + 1
+        end = int((bucket + 1) * every) + 1
+        next_end = min(int((bucket + 2) * every) + 1, n)
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        area = np.abs(
+            (x[anchor] - avg_x) * (y[start:end] - y[anchor])
+            - (x[anchor] - x[start:end]) * (avg_y - y[anchor])
+        )
+        anchor = start + int(area.argmax())
+        keep[bucket + 1] = anchor
+    return keep
+
+
+def downsample(window, granularity, max_points):
+    """Resample a ``date`` + engagement window and LTTB each metric to long form."""
+    if granularity in RESAMPLE_RULES:
+        window = (
+            window.set_index("date")[ENGAGEMENT]
+            .resample(RESAMPLE_RULES[granularity])
+            .sum()
+            .reset_index()
+        )
+
+    dates = window["date"].to_numpy()
+    x = dates.astype("int64").astype("float64")
+    frames = []
+    for metric in ENGAGEMENT:
+        y = window[metric].to_numpy(dtype="float64")
+        keep = lttb(x, y, max_points)
+        frames.append(
+            pd.DataFrame({"date": dates[keep], "metric": metric, "value": y[keep]})
+        )
+    return pd.concat(frames, ignore_index=True)
+
+
+class WindowedSeries:
+    """LRU of downsampled engagement windows with hit/miss counters.
+
+    Subclasses provide ``_window(granularity, start, end)`` returning the
+    ``date`` + engagement rows from ``start`` up to (not including) ``end``.
+    """
+
+    def __init__(self, cache_size=32):
+        self._cache = OrderedDict()
+        self._cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+
+    def series(self, granularity, start, end, max_points):
+        """Long-form ``date``/``metric``/``value`` frame for the chart."""
+        key = (granularity, pd.Timestamp(start), pd.Timestamp(end), max_points)
+        if key in self._cache:
+            self.hits += 1
+            self._cache.move_to_end(key)
+            return self._cache[key]
+        self.misses += 1
+
+        # The end bound is inclusive of the whole end day.
+        window = self._window(granularity, key[1], key[2] + pd.Timedelta(days=1))
+        result = downsample(window, granularity, max_points)
+
+        self._cache[key] = result
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        return result
+
+
+class EngagementTimeline(WindowedSeries):
+    """Per-post engagement kept sorted by date, with downsampled views.
+
+    Registered on ``IncrementalLoader`` so posts are sorted once as they
+    arrive rather than on every rerun. ``series`` resamples a date window
+    into daily/weekly sums (or keeps per-post points), then trims each metric
+    to a point budget with LTTB. Results are cached per window until the
+    data changes.
+    """
+
+    def __init__(self, cache_size=32):
+        super().__init__(cache_size)
+        self.points = None
+
+    def apply(self, delta, loader):
+        if delta.reset or self.points is None:
+            points = loader.posts
+        elif delta.posts.empty:
+            return
+        else:
+            points = pd.concat([self.points, delta.posts])
+        # Stable sort is near-linear on the mostly ordered appended data.
+        self.points = (
+            points[["date"] + ENGAGEMENT]
+            .sort_values("date", kind="stable")
+            .reset_index(drop=True)
+        )
+        self._cache.clear()
+
+    @property
+    def date_range(self):
+        """First and last post date, or ``None`` when there are no posts."""
+        dates = self.points["date"]
+        if dates.empty:
+            return None
+        return dates.iloc[0], dates.iloc[-1]
+
+    def _window(self, granularity, start, end):
+        lo, hi = np.searchsorted(
+            self.points["date"].to_numpy(), [start.to_datetime64(), end.to_datetime64()]
+        )
+        return self.points.iloc[lo:hi]
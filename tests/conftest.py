@@ -0,0 +1,36 @@
+import os
+import shutil
+import sys
+
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+POSTS = "mock_posts_biz.csv"
+COMMENTS = "mock_comments_biz.csv"
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Scratch copy of the mock CSVs as the working directory.
+
+    Every default path in ``settings`` (CSVs, caches, databases) is relative,
+    so nothing outside ``tmp_path`` is read or written.
+    """
+    for name in (POSTS, COMMENTS):
+        shutil.copy(os.path.join(ROOT, name), tmp_path)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def plain(frame):
+    """``frame`` with categoricals as objects, for comparing across loads."""
+    return frame.astype(
+        {
+            column: object
+            for column, dtype in frame.dtypes.items()
+            if isinstance(dtype, pd.CategoricalDtype)
+        }
+    )
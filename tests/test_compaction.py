@@ -0,0 +1,53 @@
+import pandas as pd
+
+from compaction import Compactor
+from conftest import plain
+from ingest import IncrementalLoader
+
+
+def _batch(first_id, n):
+    return pd.DataFrame(
+        {
+            "comment_id": range(first_id, first_id + n),
+            "platform": ["LinkedIn", "Twitter"] * (n // 2),
+            "comment_text": [f"comment {i}" for i in range(first_id, first_id + n)],
+            "sentiment": [0.5, -0.25] * (n // 2),
+            "date": ["2025-05-01", "2025-05-02"] * (n // 2),
+        }
+    )
+
+
+def test_column_choices_are_kept_across_batches():
+    compactor = Compactor(category_ratio=0.5)
+    # A header-only first batch doesn't decide anything.
+    empty = compactor.compact(_batch(1, 0).astype({"platform": object}))
+    assert compactor.categorical == {}
+    first = compactor.compact(_batch(1, 10))
+    # The second batch alone would not qualify: 2 values in 2 rows.
+    second = compactor.compact(_batch(11, 2))
+
+    for frame in (first, second):
+        assert isinstance(frame["platform"].dtype, pd.CategoricalDtype)
+        assert frame["comment_text"].dtype == object
+        assert frame["comment_id"].dtype == "int8"
+        assert frame["sentiment"].dtype == "float32"
+        assert frame["date"].dtype == "datetime64[ns]"
+    assert empty.empty
+
+
+def test_compacted_loader_holds_the_same_rows_in_less_memory(data_dir):
+    compact = IncrementalLoader("csv", compact=True, track=True)
+    loose = IncrementalLoader("csv", compact=False)
+    compact.refresh()
+    loose.refresh()
+
+    for name in ("posts", "comments"):
+        pd.testing.assert_frame_equal(
+            plain(getattr(compact, name)),
+            getattr(loose, name),
+            check_dtype=False,
+        )
+    report = compact.footprint_report()
+    assert set(report["frame"]) == {"posts", "comments"}
+    assert (report["bytes_after"] <= report["bytes_before"]).all()
+    assert report["bytes_after"].sum() < report["bytes_before"].sum() / 2
@@ -0,0 +1,65 @@
+import pandas as pd
+
+import analytics
+from conftest import COMMENTS, plain
+from cube import AnalyticsCube
+from keywords import URGENT_COLUMN, topic_column
+from settings import TECH_TOPICS
+
+
+def _expected_summary(posts, comments):
+    negative = comments[comments["sentiment_label"] == "Negative"]
+    positive = (comments["sentiment_label"] == "Positive").sum()
+    return {
+        "total_posts": len(posts),
+        "urgent_issues": int(negative[URGENT_COLUMN].sum()),
+        "positive_percentage": (
+            int(positive / len(comments) * 100) if len(comments) else 0
+        ),
+        "avg_engagement": round(posts[["likes", "shares", "comments"]].mean().mean()),
+    }
+
+
+def _assert_matches_frames(loader):
+    cube = loader.snapshot().aggregate(AnalyticsCube)
+    posts, comments = loader.posts, plain(loader.comments)
+    assert cube.summary() == _expected_summary(posts, comments)
+    assert cube.sentiment_counts().to_dict() == (
+        comments["sentiment_label"].value_counts().to_dict()
+    )
+    pd.testing.assert_frame_equal(
+        cube.sentiment_by_platform(),
+        comments.groupby(["platform", "sentiment_label"]).size().unstack(),
+        check_names=False,
+    )
+    negative = comments[comments["sentiment_label"] == "Negative"]
+    assert cube.topic_counts("Negative") == {
+        topic: int(negative[topic_column(topic)].sum()) for topic in TECH_TOPICS
+    }
+
+
+def test_cube_matches_the_frames(data_dir):
+    loader = analytics.build_loader("csv", "memory")
+    loader.refresh()
+    _assert_matches_frames(loader)
+
+    # Folding an appended delta in gives the same answers as the raw frames.
+    with open(COMMENTS, "a") as f:
+        f.write('9001,3,Twitter,"Urgent: terrible AI outage",@ops,5,2025-05-01\n')
+        f.write("9002,4,Facebook,Great cloud webinar,@cto,7,2025-05-01\n")
+    loader.refresh()
+    _assert_matches_frames(loader)
+
+
+def test_cube_without_comments(data_dir):
+    with open(COMMENTS) as f:
+        header = f.readline()
+    with open(COMMENTS, "w") as f:
+        f.write(header)
+    loader = analytics.build_loader("csv", "memory")
+    loader.refresh()
+
+    summary = analytics.executive_summary(loader.snapshot())
+    assert summary["total_posts"] == 500
+    assert summary["urgent_issues"] == summary["positive_percentage"] == 0
+    assert set(analytics.topic_volume(loader.snapshot()).values()) == {0}
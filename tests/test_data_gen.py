@@ -0,0 +1,69 @@
+import functools
+
+import pandas as pd
+import pytest
+
+import data_gen
+from columnar import COMMENTS_SCHEMA, POSTS_SCHEMA, read_columnar
+from conftest import plain
+from data_gen import generate, write
+
+_pools = functools.lru_cache(data_gen._make_pools)
+
+
+@pytest.fixture(autouse=True)
+def cached_pools(monkeypatch):
+    # The Faker name pools take seconds to build and only depend on the seed.
+    monkeypatch.setattr(data_gen, "_make_pools", _pools)
+
+
+def _concat(chunks):
+    posts, comments = zip(*chunks)
+    return pd.concat(posts, ignore_index=True), pd.concat(comments, ignore_index=True)
+
+
+@pytest.mark.parametrize("target", [1, 7, 1000, 2501])
+def test_exact_comment_target_across_chunks(target):
+    posts, comments = _concat(generate(comments=target, chunk_size=300))
+
+    assert comments["comment_id"].tolist() == list(range(1, target + 1))
+    assert posts["post_id"].tolist() == list(range(1, len(posts) + 1))
+    assert comments["post_id"].isin(posts["post_id"]).all()
+    # Only the last post can lose comments to the cut.
+    assert posts["post_id"].iloc[-1] == comments["post_id"].iloc[-1]
+
+
+def test_posts_get_three_to_five_comments():
+    posts, comments = _concat(generate(posts=1200, chunk_size=1000))
+
+    assert len(posts) == 1200
+    per_post = comments.groupby("post_id").size().reindex(posts["post_id"])
+    assert per_post.between(3, 5).all()
+    assert list(posts.columns) == POSTS_SCHEMA.names
+    assert list(comments.columns) == COMMENTS_SCHEMA.names
+
+
+def test_seeded_output_is_reproducible():
+    first = _concat(generate(posts=50, seed=42))
+    again = _concat(generate(posts=50, seed=42))
+    other = _concat(generate(posts=50, seed=43))
+
+    pd.testing.assert_frame_equal(first[1], again[1])
+    assert not first[1]["comment_text"].equals(other[1]["comment_text"])
+
+
+@pytest.mark.parametrize("data_format", ["csv", "parquet"])
+def test_written_files_round_trip(tmp_path, data_format):
+    posts, comments = _concat(generate(comments=900, chunk_size=200))
+    paths = write(generate(comments=900, chunk_size=200), tmp_path, data_format)
+
+    if data_format == "csv":
+        read = [pd.read_csv(path, parse_dates=["date"]) for path in paths]
+    else:
+        read = [read_columnar(path) for path in paths]
+    for frame, written in zip((posts, comments), read):
+        pd.testing.assert_frame_equal(
+            plain(written),
+            frame.assign(date=pd.to_datetime(frame["date"])),
+            check_dtype=False,
+        )
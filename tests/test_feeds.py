@@ -0,0 +1,95 @@
+import asyncio
+import json
+
+import pandas as pd
+
+from conftest import COMMENTS, POSTS
+from feeds import FeedService, normalize
+
+
+def _export(drop, name, records):
+    with open(drop / name, "a") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+
+
+def _run(drop):
+    service = FeedService(drop, POSTS, COMMENTS, state_path="feeds.sqlite")
+    return asyncio.run(service.run(follow=False))
+
+
+def _post(native_id, day="2025-05-01"):
+    return {
+        "id": native_id,
+        "text": f"post {native_id}",
+        "reactions": native_id,
+        "created_at": f"{day}T09:30:00Z",
+    }
+
+
+def _comment(native_id, post_id):
+    return {
+        "id": native_id,
+        "post_id": post_id,
+        "text": f"reply {native_id} to post {post_id}",
+        "author": "@ops",
+        "created_at": "2025-05-01T10:45:12Z",
+    }
+
+
+def test_normalize_keeps_native_ids_as_text():
+    records = [_comment(10, 2), {"id": 11, "text": "no post"}, _comment(12, 3)]
+
+    rows = normalize(records, "LinkedIn", "comments")
+
+    assert rows["native_id"].tolist() == ["10", "12"]
+    assert rows["native_post_id"].tolist() == ["2", "3"]
+    assert rows["likes"].tolist() == [0, 0]
+    assert rows["date"].iloc[0] == pd.Timestamp("2025-05-01 10:45:12")
+
+
+def test_comments_map_to_canonical_post_ids(data_dir):
+    drop = data_dir / "drop"
+    drop.mkdir()
+    _export(drop, "linkedin_posts.jsonl", [_post(1), _post(2)])
+    _export(
+        drop,
+        "linkedin_comments.jsonl",
+        [_comment(n, n % 3 + 1) for n in range(100, 109)] + [{"id": 5, "text": "?"}],
+    )
+    first = _run(drop)
+    assert first["pending"] == 3
+
+    # After a restart: post 3 arrives, post 1 and two comments are re-exported.
+    _export(drop, "linkedin_posts.jsonl", [_post(1, "2025-05-02"), _post(3)])
+    _export(drop, "linkedin_comments.jsonl", [_comment(100, 2), _comment(101, 3)])
+    second = _run(drop)
+    assert second == {"posts": 1, "comments": 3, "scored": 0, "pending": 0}
+
+    posts = pd.read_csv(POSTS).set_index("post_id")
+    comments = pd.read_csv(COMMENTS)
+    new = comments[comments["comment_id"] > 2001]
+    assert posts.index.is_unique and len(posts) == 503
+    assert new["comment_id"].tolist() == list(range(2002, 2011))
+    # Every comment hangs off the post its text names.
+    named = new["comment_text"].str.extract(r"post (\d+)")[0]
+    assert (posts.loc[new["post_id"], "post_text"].to_numpy() == "post " + named).all()
+    assert (new["date"] == "2025-05-01 10:45:12").all()
+
+
+def test_kinds_with_different_reader_counts(data_dir):
+    drop = data_dir / "drop"
+    drop.mkdir()
+    _export(drop, "linkedin_posts.jsonl", [_post(1)])
+    _export(drop, "linkedin_comments.jsonl", [_comment(100, 1)])
+    service = FeedService(drop, POSTS, COMMENTS, state_path="feeds.sqlite")
+    # Twitter and Facebook only export posts here.
+    service.exports = [
+        export
+        for export in service.exports
+        if export.kind == "posts" or export.platform == "LinkedIn"
+    ]
+
+    stats = asyncio.run(asyncio.wait_for(service.run(follow=False), 30))
+
+    assert (stats["posts"], stats["comments"]) == (1, 1)
@@ -0,0 +1,119 @@
+import sqlite3
+import subprocess
+import sys
+
+import pandas as pd
+import pytest
+
+import analytics
+from columnar import COMMENTS_SCHEMA, POSTS_SCHEMA, convert_csv
+from conftest import COMMENTS, POSTS, ROOT, plain
+import ingest
+from ingest import IncrementalLoader
+from post_index import PostIndex
+
+
+def _split(path, keep):
+    """Truncate ``path`` to its header plus ``keep`` rows; return the rest as bytes."""
+    with open(path, "rb") as f:
+        lines = f.readlines()
+    with open(path, "wb") as f:
+        f.writelines(lines[: keep + 1])
+    return b"".join(lines[keep + 1 :])
+
+
+def _append(path, data):
+    with open(path, "ab") as f:
+        f.write(data)
+
+
+def _assert_same(loader, fresh):
+    pd.testing.assert_frame_equal(plain(loader.posts), plain(fresh.posts))
+    pd.testing.assert_frame_equal(plain(loader.comments), plain(fresh.comments))
+
+
+def test_appends_match_a_full_reload(data_dir):
+    new_posts = _split(POSTS, 400)
+    new_comments = _split(COMMENTS, 1200)
+    loader = analytics.build_loader("csv", "memory")
+    loader.refresh()
+
+    # A partially written line is left for the next refresh.
+    cut = new_comments.index(b"\n", len(new_comments) // 2) + 10
+    _append(COMMENTS, new_comments[:cut])
+    delta = loader.refresh()
+    assert not delta.reset
+    assert len(loader.comments) == 1200 + new_comments[:cut].count(b"\n")
+
+    _append(POSTS, new_posts)
+    _append(COMMENTS, new_comments[cut:])
+    delta = loader.refresh()
+    assert not delta.reset and len(delta.posts) == 100
+
+    fresh = analytics.build_loader("csv", "memory")
+    fresh.refresh()
+    _assert_same(loader, fresh)
+    assert analytics.executive_summary(
+        loader.snapshot()
+    ) == analytics.executive_summary(fresh.snapshot())
+    assert loader.refresh().posts.empty
+
+
+def test_failed_refresh_is_retried(data_dir, monkeypatch):
+    loader = analytics.build_loader("csv", "memory")
+    loader.refresh()
+    _append(POSTS, b'501,LinkedIn,"Zero Trust rollout",webinar,12,3,4,2025-05-01\n')
+    _append(COMMENTS, b'9001,501,LinkedIn,"critical outage",@ops,5,2025-05-01\n')
+
+    enrich = ingest.enrich_comments
+
+    def locked(*args):
+        monkeypatch.setattr(ingest, "enrich_comments", enrich)
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(ingest, "enrich_comments", locked)
+    with pytest.raises(sqlite3.OperationalError):
+        loader.refresh()
+    # Nothing from the failed refresh was kept...
+    assert len(loader.posts) == 500 and loader.watermarks["post_id"] == 500
+
+    # ...so the retry picks up both rows and every aggregate sees them.
+    delta = loader.refresh()
+    assert delta.posts["post_id"].tolist() == [501]
+    assert delta.comments["comment_id"].tolist() == [9001]
+    snapshot = loader.snapshot()
+    assert analytics.executive_summary(snapshot)["total_posts"] == 501
+    assert snapshot.aggregate(PostIndex).label(501).endswith("Zero Trust rollout")
+
+
+def test_regenerated_csv_is_reloaded(data_dir):
+    loader = IncrementalLoader("csv")
+    loader.refresh()
+
+    # Rewritten in place with more rows than before, not appended to.
+    subprocess.run(
+        [sys.executable, f"{ROOT}/src/data_gen.py", "--seed", "2", "--posts", "700"],
+        check=True,
+        capture_output=True,
+    )
+    delta = loader.refresh()
+
+    fresh = IncrementalLoader("csv")
+    fresh.refresh()
+    assert delta.reset
+    _assert_same(loader, fresh)
+
+
+def test_auto_format_follows_appended_csv(data_dir):
+    for path, schema in ((POSTS, POSTS_SCHEMA), (COMMENTS, COMMENTS_SCHEMA)):
+        convert_csv(path, schema)
+    loader = IncrementalLoader("auto")
+    loader.refresh()
+    assert loader.watermarks["comment_id"] == 2001
+
+    # Appending makes the Parquet copy stale; the CSV takes over.
+    _append(COMMENTS, b'9001,3,Twitter,"urgent outage",@ops,5,2025-05-01 10:30:00\n')
+    delta = loader.refresh()
+
+    assert delta.comments["comment_id"].tolist() == [9001]
+    assert delta.comments["date"].iloc[0] == pd.Timestamp("2025-05-01 10:30")
@@ -0,0 +1,49 @@
+import json
+import subprocess
+import sys
+
+from conftest import ROOT
+from instrumentation import Profiler
+
+SCRIPT = """
+from instrumentation import Profiler
+profiler = Profiler(enabled=True)
+with profiler.stage("load_data") as stage:
+    stage.rows = 3
+profiler.finish()
+"""
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = Profiler(enabled=False)
+    with profiler.stage("load_data") as stage:
+        stage.rows = 3
+    profiler.finish()
+    assert profiler.records() == []
+
+
+def test_stage_lines_are_logged_without_logging_config():
+    # A bare interpreter, like Streamlit, leaves the root logger unconfigured.
+    result = subprocess.run(
+        [sys.executable, "-c", SCRIPT],
+        cwd=f"{ROOT}/src",
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    record = json.loads(result.stderr)
+    assert record["event"] == "stage" and record["stage"] == "load_data"
+    assert record["rows"] == 3 and record["seconds"] >= 0
+
+
+def test_prometheus_file(tmp_path):
+    path = tmp_path / "metrics.prom"
+    profiler = Profiler(enabled=True, metrics_file=path)
+    with profiler.stage("summary") as stage:
+        stage.hits, stage.misses = 2, 1
+    profiler.finish()
+
+    lines = path.read_text().splitlines()
+    assert 'sma_stage_cache_hits{stage="summary"} 2' in lines
+    assert 'sma_stage_cache_misses{stage="summary"} 1' in lines
+    assert not any(line.startswith("sma_stage_rows{") for line in lines)
@@ -0,0 +1,52 @@
+import os
+
+import pandas as pd
+
+from conftest import COMMENTS, ROOT
+from keywords import KeywordMatcher, build_matcher
+
+GROUPS = {
+    "urgent": ["urgent", "critical", "outage"],
+    "ai": ["AI", "artificial intelligence"],
+    # Terms that are prefixes, suffixes and infixes of each other
+    "nested": ["he", "she", "his", "hers"],
+    "cloud": ["cloud", "AWS", "Azure"],
+}
+TEXTS = [
+    "URGENT: AWS outage in eu-west",
+    "ushers",
+    "Sheer luck",
+    "this is hers",
+    "Artificial Intelligence roadmap",
+    "fair pricing",
+    "",
+    None,
+    "Azure-cloud migration",
+    "nothing to see",
+]
+
+
+def _expected(texts, terms):
+    texts = texts.fillna("")
+    matches = [texts.str.contains(term, case=False, regex=False) for term in terms]
+    return pd.concat(matches, axis=1).any(axis=1)
+
+
+def test_classify_matches_str_contains():
+    comments = pd.read_csv(os.path.join(ROOT, COMMENTS))["comment_text"]
+    texts = pd.concat([pd.Series(TEXTS), comments], ignore_index=True)
+
+    flags = KeywordMatcher(GROUPS).classify(texts)
+
+    assert list(flags.columns) == list(GROUPS)
+    for column, terms in GROUPS.items():
+        pd.testing.assert_series_equal(
+            flags[column], _expected(texts, terms), check_names=False
+        )
+
+
+def test_build_matcher_keeps_index():
+    texts = pd.Series(["critical outage", "cloud"], index=[10, 20])
+    flags = build_matcher().classify(texts)
+    assert list(flags.index) == [10, 20]
+    assert flags.loc[10, "is_urgent"] and not flags.loc[20, "is_urgent"]
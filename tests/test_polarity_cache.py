@@ -0,0 +1,53 @@
+import sqlite3
+
+import polarity_cache
+from polarity_cache import PolarityCache
+
+
+def _last_used(path):
+    with sqlite3.connect(path) as conn:
+        return dict(conn.execute("SELECT score, last_used FROM polarity"))
+
+
+def test_scores_survive_reopening(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    with PolarityCache("v1", path=path) as cache:
+        cache.put_many({"great": 0.8, "awful": -1.0})
+
+    with PolarityCache("v1", path=path) as cache:
+        assert cache.get_many(["great", "awful", "new"]) == {
+            "great": 0.8,
+            "awful": -1.0,
+        }
+        assert (cache.hits, cache.misses) == (2, 1)
+    # A new scorer version doesn't see the old scores.
+    with PolarityCache("v2", path=path) as cache:
+        assert cache.get_many(["great"]) == {}
+
+
+def test_recent_hits_are_not_rewritten(tmp_path, monkeypatch):
+    path = tmp_path / "cache.sqlite"
+    clock = iter([1000.0, 1000.0, 1000.0 + polarity_cache._TOUCH_SECONDS + 1])
+    monkeypatch.setattr(polarity_cache.time, "time", lambda: next(clock))
+    with PolarityCache("v1", path=path) as cache:
+        cache.put_many({"a": 0.1, "b": 0.2})
+        cache.get_many(["a"])
+        assert _last_used(path) == {0.1: 1000.0, 0.2: 1000.0}
+        cache.get_many(["a"])
+        assert _last_used(path) == {
+            0.1: 1000.0 + polarity_cache._TOUCH_SECONDS + 1,
+            0.2: 1000.0,
+        }
+
+
+def test_least_recently_used_are_evicted(tmp_path, monkeypatch):
+    clock = iter(range(0, 10**6, polarity_cache._TOUCH_SECONDS * 2))
+    monkeypatch.setattr(polarity_cache.time, "time", lambda: float(next(clock)))
+    with PolarityCache("v1", path=tmp_path / "cache.sqlite", max_entries=2) as cache:
+        cache.put_many({"a": 0.1})
+        cache.put_many({"b": 0.2})
+        cache.get_many(["a"])
+        cache.put_many({"c": 0.3})
+
+        assert len(cache) == 2
+        assert cache.get_many(["a", "b", "c"]) == {"a": 0.1, "c": 0.3}
@@ -0,0 +1,61 @@
+import pandas as pd
+
+import analytics
+from conftest import COMMENTS, POSTS
+from post_index import PostIndex, SearchCache
+
+
+def _assert_matches_frames(loader):
+    index = loader.snapshot().aggregate(PostIndex)
+    posts, comments = loader.posts, loader.comments
+    sample = posts["post_id"].sample(25, random_state=0).tolist()
+    for post_id in sample + [7, posts["post_id"].iloc[-1]]:
+        expected = posts[posts["post_id"] == post_id].iloc[0]
+        pd.testing.assert_series_equal(index.post(post_id), expected)
+        pd.testing.assert_frame_equal(
+            index.comments_for(post_id), comments[comments["post_id"] == post_id]
+        )
+
+
+def test_lookups_match_filtering_the_frames(data_dir):
+    loader = analytics.build_loader("csv", "memory")
+    loader.refresh()
+    _assert_matches_frames(loader)
+
+    # Appended rows are indexed without rebuilding.
+    with open(POSTS, "a") as f:
+        f.write("501,Twitter,Zero Trust rollout,webinar,1,2,3,2025-05-01\n")
+    with open(COMMENTS, "a") as f:
+        f.write("9001,501,Twitter,First!,@ops,5,2025-05-01\n")
+        f.write("9002,7,Twitter,Late reply,@sre,1,2025-05-01\n")
+    loader.refresh()
+    _assert_matches_frames(loader)
+    index = loader.snapshot().aggregate(PostIndex)
+    assert index.comments_for(501)["comment_id"].tolist() == [9001]
+    assert index.comments_for(12345).empty
+    assert index.label(501) == "#501 · Twitter · Zero Trust rollout"
+
+
+def test_search(data_dir):
+    loader = analytics.build_loader("csv", "memory")
+    loader.refresh()
+    posts = loader.posts
+    index = loader.snapshot().aggregate(PostIndex)
+
+    expected = posts.loc[
+        posts["post_text"].str.contains("cloud", case=False, regex=False), "post_id"
+    ]
+    assert index.search("  CLOUD ").tolist() == expected.tolist()
+    assert index.search("").tolist() == posts["post_id"].tolist()
+    assert len(index.search("no such post")) == 0
+
+
+def test_search_cache_is_bounded():
+    calls = []
+    cache = SearchCache(lambda query: calls.append(query) or query, size=2)
+
+    assert cache.get(" A") == cache.get("a ") == "a"
+    cache.get("b")
+    cache.get("c")
+    assert calls == ["a", "b", "c"]
+    assert cache.get("a") == "a" and calls[-1] == "a"
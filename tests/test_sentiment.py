@@ -0,0 +1,44 @@
+import os
+
+import pandas as pd
+from textblob import TextBlob
+
+import sentiment
+from conftest import COMMENTS, ROOT
+from sentiment import label_sentiment, score_polarity, score_texts
+
+
+def _comment_texts():
+    return pd.read_csv(os.path.join(ROOT, COMMENTS))["comment_text"]
+
+
+def test_score_polarity_matches_per_row_textblob():
+    texts = pd.concat(
+        [_comment_texts().head(300), pd.Series([None, ""])], ignore_index=True
+    )
+    texts.index += 10
+
+    scores = score_polarity(texts)
+
+    expected = texts.fillna("").apply(lambda text: TextBlob(text).sentiment.polarity)
+    pd.testing.assert_series_equal(scores, expected, check_names=False)
+    assert scores.name == "sentiment"
+
+
+def test_label_thresholds():
+    scores = pd.Series([0.5, 0.2, 0.0, -0.2, -0.21], index=[5, 6, 7, 8, 9])
+    assert label_sentiment(scores).to_dict() == {
+        5: "Positive",
+        6: "Neutral",
+        7: "Neutral",
+        8: "Neutral",
+        9: "Negative",
+    }
+
+
+def test_pool_keeps_scores_in_order(monkeypatch):
+    texts = _comment_texts().drop_duplicates().head(200).tolist()
+    monkeypatch.setattr(sentiment, "SENTIMENT_PARALLEL_MIN_TEXTS", 0)
+    monkeypatch.setattr(sentiment, "SENTIMENT_CHUNK_SIZE", 7)
+
+    assert score_texts(texts, workers=3) == [sentiment.polarity(t) for t in texts]
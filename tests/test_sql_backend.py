@@ -0,0 +1,104 @@
+import pandas as pd
+import pytest
+
+import analytics
+from conftest import COMMENTS, POSTS, plain
+
+QUERIES = ["", "cloud", "AI", "no such post"]
+
+
+def _assert_same(memory, sql):
+    m, s = memory.snapshot(), sql.snapshot()
+    assert analytics.executive_summary(m) == analytics.executive_summary(s)
+    pd.testing.assert_frame_equal(
+        analytics.sentiment_distribution(m), analytics.sentiment_distribution(s)
+    )
+    pd.testing.assert_frame_equal(
+        analytics.sentiment_by_platform(m),
+        analytics.sentiment_by_platform(s),
+        check_names=False,
+    )
+    assert analytics.topic_volume(m) == analytics.topic_volume(s)
+    assert analytics.topic_complaints(m) == analytics.topic_complaints(s)
+    assert analytics.alert_counts(m) == analytics.alert_counts(s)
+    for window in analytics.alert_counts(m):
+        pd.testing.assert_frame_equal(
+            plain(analytics.critical_alerts(m, window)),
+            analytics.critical_alerts(s, window),
+            check_dtype=False,
+        )
+    pd.testing.assert_frame_equal(
+        analytics.complaint_clusters(m), analytics.complaint_clusters(s)
+    )
+    for query in QUERIES:
+        assert (
+            analytics.search_posts(m, query).tolist()
+            == analytics.search_posts(s, query).tolist()
+        )
+    start, end = analytics.engagement_date_range(m)
+    assert (start, end) == analytics.engagement_date_range(s)
+    for granularity in ("post", "day", "week"):
+        pd.testing.assert_frame_equal(
+            analytics.engagement_series(m, granularity, start, end, 300),
+            analytics.engagement_series(s, granularity, start, end, 300),
+            check_dtype=False,
+        )
+    post, comments = analytics.post_detail(m, 7)
+    sql_post, sql_comments = analytics.post_detail(s, 7)
+    assert post["post_text"] == sql_post["post_text"]
+    assert comments["comment_id"].tolist() == sql_comments["comment_id"].tolist()
+
+
+@pytest.fixture
+def backends(data_dir):
+    memory = analytics.build_loader("csv", "memory")
+    sql = analytics.build_loader("csv", "sqlite")
+    memory.refresh()
+    sql.refresh()
+    return memory, sql
+
+
+def test_sql_matches_memory(backends):
+    _assert_same(*backends)
+
+
+def test_sql_matches_memory_after_append(backends):
+    with open(COMMENTS, "a") as f:
+        f.write(
+            '9001,7,Twitter,"Critical outage, terrible support",@ops,90,2024-06-20\n'
+        )
+        f.write(
+            '9002,7,Twitter,"Critical outage, terrible support!",@sre,3,2024-06-20\n'
+        )
+    for backend in backends:
+        backend.refresh()
+    _assert_same(*backends)
+    assert analytics.critical_alerts(backends[1].snapshot())["comment_id"][0] == 9001
+
+
+def test_sql_without_comments(data_dir):
+    with open(COMMENTS) as f:
+        header = f.readline()
+    with open(COMMENTS, "w") as f:
+        f.write(header)
+    sql = analytics.build_loader("csv", "sqlite")
+    sql.refresh()
+
+    snapshot = sql.snapshot()
+    assert set(analytics.alert_counts(snapshot).values()) == {0}
+    assert analytics.critical_alerts(snapshot, "Last day").empty
+    assert analytics.executive_summary(snapshot)["positive_percentage"] == 0
+
+
+def test_sql_without_posts(data_dir):
+    for name in (POSTS, COMMENTS):
+        with open(name) as f:
+            header = f.readline()
+        with open(name, "w") as f:
+            f.write(header)
+    sql = analytics.build_loader("csv", "sqlite")
+    sql.refresh()
+
+    snapshot = sql.snapshot()
+    assert analytics.engagement_date_range(snapshot) is None
+    assert len(analytics.search_posts(snapshot)) == 0
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import analytics
+from conftest import COMMENTS, POSTS
+from timeseries import downsample, lttb
+
+
+@pytest.mark.parametrize("n", [1, 2, 3, 10, 1000])
+@pytest.mark.parametrize("max_points", [3, 4, 50, 2000])
+def test_lttb_keeps_endpoints_within_budget(n, max_points):
+    rng = np.random.default_rng(n * max_points)
+    x = np.sort(rng.random(n)) * 100
+    y = rng.normal(size=n)
+
+    keep = lttb(x, y, max_points)
+
+    assert len(keep) == min(n, max_points)
+    assert keep[0] == 0 and keep[-1] == n - 1
+    assert np.all(np.diff(keep) > 0)
+
+
+def test_lttb_keeps_the_spike():
+    y = np.zeros(1000)
+    y[637] = 50.0
+    keep = lttb(np.arange(1000.0), y, 20)
+    assert 637 in keep
+
+
+def test_downsample_budget_per_metric():
+    dates = pd.date_range("2024-01-01", periods=5000, freq="h")
+    rng = np.random.default_rng(0)
+    window = pd.DataFrame(
+        {
+            "date": dates,
+            "likes": rng.integers(0, 100, len(dates)),
+            "shares": rng.integers(0, 10, len(dates)),
+            "comments": rng.integers(0, 20, len(dates)),
+        }
+    )
+
+    series = downsample(window, "post", 100)
+    assert series.groupby("metric").size().max() <= 100
+
+    daily = downsample(window, "day", 1000)
+    assert daily.groupby("metric").size().eq(len(dates) // 24 + 1).all()
+    assert daily.loc[daily["metric"] == "likes", "value"].sum() == window["likes"].sum()
+
+
+def test_timeline_without_posts(data_dir):
+    for name in (POSTS, COMMENTS):
+        with open(name) as f:
+            header = f.readline()
+        with open(name, "w") as f:
+            f.write(header)
+    loader = analytics.build_loader("csv", "memory")
+    loader.refresh()
+
+    assert analytics.engagement_date_range(loader.snapshot()) is None